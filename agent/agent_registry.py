@@ -0,0 +1,43 @@
+"""
+Process-wide registry of compiled agents and graphs.
+
+Compiling a ReAct agent or a LangGraph graph is pure setup work, and the
+compiled objects are safe to invoke concurrently, so each one is built once
+per process and reused.
+"""
+
+import threading
+from typing import Any, Callable, Hashable
+
+from langgraph.prebuilt import create_react_agent
+
+_registry: dict[Hashable, Any] = {}
+_lock = threading.Lock()
+
+
+def get_or_build(key: Hashable, builder: Callable[[], Any]) -> Any:
+    with _lock:
+        if key not in _registry:
+            _registry[key] = builder()
+        return _registry[key]
+
+
+def _llm_key(llm) -> tuple:
+    return getattr(llm, "model_name", type(llm).__name__), getattr(llm, "temperature", None)
+
+
+def get_react_agent(llm, tools: list) -> Any:
+    """Return the compiled ReAct agent for this model and tool set."""
+    key = ("react", _llm_key(llm), tuple(tool.name for tool in tools))
+    return get_or_build(key, lambda: create_react_agent(llm, tools))
+
+
+def get_structured_llm(llm, schema: type) -> Any:
+    """Return `llm.with_structured_output(schema)`, built once per model and schema."""
+    key = ("structured", _llm_key(llm), schema)
+    return get_or_build(key, lambda: llm.with_structured_output(schema))
+
+
+def clear() -> None:
+    with _lock:
+        _registry.clear()
@@ -1,10 +1,11 @@
-from langchain_groq import ChatGroq
-
+from agent.llm_gateway import get_llm
+from agent.llm_cache import invoke_structured
+from agent.context_packer import pack_grouped, ARCHITECT_CONTEXT_TOKENS, ARCHITECT_FILE_TOKENS, ARCHITECT_FILE_CONTEXT_TOKENS
 from agent.states import TaskPlan, ImplementationTask, EnhancedPlan, File
-from agent.knowledge_base.kb_manager import KnowledgeBaseManager
+from agent.knowledge_base.kb_manager import KnowledgeBaseManager, get_kb_manager
 
 
-architect_llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0)
+architect_llm = get_llm(temperature=0)
 
 
 def architect_agent_v2(state: dict) -> dict:
@@ -37,14 +38,14 @@ def architect_agent_v2(state: dict) -> dict:
     
     tech_stacks = plan.required_tech_stacks
 
-    kb_manager = KnowledgeBaseManager()
+    kb_manager = get_kb_manager()
     
     arch_patterns = _get_architecture_patterns(kb_manager, tech_stacks, plan.name)
     file_patterns = _get_file_patterns(kb_manager, plan.files, tech_stacks)
 
     prompt = _build_architect_prompt(plan, arch_patterns, file_patterns, user_edits)
     
-    response = architect_llm.with_structured_output(TaskPlan).invoke(prompt)
+    response = invoke_structured(architect_llm, TaskPlan, prompt, use_cache=state.get("use_cache", True))
     
     if response is None:
         raise ValueError("Architect did not return a valid response")
@@ -87,21 +88,21 @@ def _get_file_patterns(kb_manager: KnowledgeBaseManager, files: list, tech_stack
         ".ts": "nodejs"
     }
     
-    for file in files[:5]:
+    lookups = []
+    for file in files:
         ext = "." + file.path.split(".")[-1] if "." in file.path else ""
         tech = tech_by_extension.get(ext)
         
         if tech and tech in tech_stacks:
-            try:
-                results = kb_manager.query_single_tech(
-                    tech_stack=tech,
-                    query=file.purpose,
-                    n_results=2
-                )
-                if results:
-                    patterns[file.path] = results
-            except Exception:
-                pass
+            lookups.append((file.path, tech, file.purpose))
+
+    unique_queries = list(dict.fromkeys((tech, purpose) for _, tech, purpose in lookups))
+    results = kb_manager.query_batch(unique_queries, n_results=2)
+    results_by_query = dict(zip(unique_queries, results))
+    
+    for path, tech, purpose in lookups:
+        if results_by_query.get((tech, purpose)):
+            patterns[path] = results_by_query[(tech, purpose)]
     
     return patterns
 
@@ -144,6 +145,7 @@ INSTRUCTIONS:
    - Detailed implementation description
    - Functions/classes to create
    - Integration with other files
+   - depends_on: paths of the files it imports or relies on (empty for standalone files)
 4. Reference production patterns when applicable
 
 IMPORTANT:
@@ -157,11 +159,10 @@ def _format_patterns(patterns: dict) -> str:
         return ""
     
     parts = []
-    for tech, examples in patterns.items():
+    for tech, examples in pack_grouped(patterns, ARCHITECT_CONTEXT_TOKENS, max_per_group=2).items():
         parts.append(f"\n### {tech.upper()}:")
-        for ex in examples[:2]:
-            code = ex.get("code", "")[:300]
-            parts.append(f"```\n{code}\n```")
+        for ex in examples:
+            parts.append(f"```\n{ex['code']}\n```")
     return "\n".join(parts)
 
 
@@ -169,10 +170,10 @@ def _format_file_patterns(file_patterns: dict) -> str:
     if not file_patterns:
         return ""
     
+    budget = min(ARCHITECT_FILE_TOKENS * len(file_patterns), ARCHITECT_FILE_CONTEXT_TOKENS)
     parts = []
-    for filepath, examples in file_patterns.items():
+    for filepath, examples in pack_grouped(file_patterns, budget, max_per_group=1).items():
         parts.append(f"\n### {filepath}:")
-        for ex in examples[:1]:
-            code = ex.get("code", "")[:400]
-            parts.append(f"```\n{code}\n```")
+        for ex in examples:
+            parts.append(f"```\n{ex['code']}\n```")
     return "\n".join(parts)
@@ -0,0 +1,118 @@
+"""
+Content-addressed store for generated file contents.
+
+Checkpoints, ProjectFile rows and FileDiff state hold a blob ref (the sha256
+of the UTF-8 text) instead of the text itself, so status reads and state
+copies stop moving whole files around. Blobs are zlib-compressed in SQLite
+under .appbuilder/blobs in the project root (not the working directory, so
+every worker finds the same store); identical content (boilerplate shared by
+many projects) is stored once.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH", str(PROJECT_ROOT / ".appbuilder" / "blobs" / "blobs.sqlite3"))
+BLOB_COMPRESSION_LEVEL = 6
+_LOOKUP_CHUNK = 500
+
+
+def blob_ref(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    def __init__(self, path: str | Path = BLOB_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "ref TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def put(self, text: str) -> str:
+        return self.put_many([text])[0]
+
+    def put_many(self, texts: Iterable[str]) -> list[str]:
+        refs = []
+        rows = {}
+        now = time.time()
+        for text in texts:
+            raw = text.encode("utf-8")
+            ref = hashlib.sha256(raw).hexdigest()
+            refs.append(ref)
+            if ref not in rows:
+                rows[ref] = (ref, zlib.compress(raw, BLOB_COMPRESSION_LEVEL), len(raw), now)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO blobs (ref, data, size, created_at) VALUES (?, ?, ?, ?)",
+                list(rows.values())
+            )
+            self._conn.commit()
+        return refs
+
+    def get(self, ref: str) -> Optional[str]:
+        return self.get_many([ref]).get(ref)
+
+    def get_many(self, refs: Iterable[str]) -> dict[str, str]:
+        refs = list(dict.fromkeys(refs))
+        found = {}
+        with self._lock:
+            for start in range(0, len(refs), _LOOKUP_CHUNK):
+                chunk = refs[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT ref, data FROM blobs WHERE ref IN ({placeholders})", chunk
+                ).fetchall()
+                for ref, data in rows:
+                    found[ref] = zlib.decompress(data).decode("utf-8")
+        return found
+
+    def size(self, ref: str) -> Optional[int]:
+        """Uncompressed size in bytes, without reading the blob."""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM blobs WHERE ref = ?", (ref,)).fetchone()
+        return row[0] if row else None
+
+    def __contains__(self, ref: str) -> bool:
+        return self.size(ref) is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs"
+            ).fetchone()
+        return {"blobs": count, "bytes": size, "stored_bytes": stored}
+
+
+_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BlobStore()
+        return _store
+
+
+def put_text(text: Optional[str]) -> Optional[str]:
+    """Store `text` and return its ref; None stays None."""
+    return None if text is None else get_blob_store().put(text)
+
+
+def get_text(ref: Optional[str]) -> Optional[str]:
+    """Text for a ref; None for no ref or a blob missing from this store."""
+    return None if ref is None else get_blob_store().get(ref)
@@ -5,15 +5,53 @@ Manages state persistence for file-based code generation:
 - Saves file-level progress to disk
 - Enables resume from failure
 - Tracks dependencies for proper ordering
+
+Saves are journaled: status transitions since the last save are appended to
+`<checkpoint>.journal` as JSON lines, and `load` replays them over the last
+snapshot. The snapshot is rewritten (atomically) only when the journal outgrows
+it, when the project structure or a FileSpec was changed in place, or when
+generation is complete.
+
+Every save also writes `<checkpoint>.summary` (status counts, next file)
+stamped with the snapshot and journal stats it describes, so status endpoints
+can use `load_summary` instead of loading the whole checkpoint. File paths only
+change with a snapshot, so `load_file_paths` reads them from the snapshot alone.
+
+Checkpoints are keyed by project id and several processes (uvicorn workers,
+background generators) may share the checkpoint directory: saves hold an
+exclusive lock on `<checkpoint>.lock`, loads a shared one. A save that finds
+another writer's changes on disk merges them in before writing its own.
 """
 
+import heapq
 import json
+import os
+import re
+import threading
 import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+
+from agent.blob_store import get_text, put_text
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+CHECKPOINT_JOURNAL = os.getenv("CHECKPOINT_JOURNAL", "true").lower() in ("1", "true", "yes")
+# The snapshot is rewritten once the journal is larger than both this and the snapshot itself
+CHECKPOINT_COMPACT_BYTES = int(os.getenv("CHECKPOINT_COMPACT_BYTES", str(1024 * 1024)))
+SUMMARY_VERSION = 2
+
+
+class CheckpointConflictError(RuntimeError):
+    """A checkpoint was restructured concurrently, so two writers' changes cannot be merged."""
 
 
 class TaskStatus(str, Enum):
@@ -37,7 +75,96 @@ class FileSpec(BaseModel):
     status: TaskStatus = Field(default=TaskStatus.PENDING)
     attempts: int = Field(default=0, description="Number of generation attempts")
     last_error: Optional[str] = Field(default=None, description="Last error message if failed")
-    generated_content: Optional[str] = Field(default=None, description="The generated content")
+    content_ref: Optional[str] = Field(default=None, description="Blob store ref of the generated content")
+    content_size: Optional[int] = Field(default=None, description="Size of the generated content in bytes")
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _store_inline_content(cls, data):
+        # Checkpoints written before the blob store kept the content inline
+        if isinstance(data, dict) and data.get("generated_content") is not None:
+            data = dict(data)
+            content = data.pop("generated_content")
+            data["content_ref"] = put_text(content)
+            data["content_size"] = len(content.encode("utf-8"))
+        return data
+    
+    @property
+    def generated_content(self) -> Optional[str]:
+        """The generated content, read from the blob store."""
+        return get_text(self.content_ref)
+
+
+class _Schedule:
+    """
+    Id index, dependency in-degrees and ready queue over a checkpoint's files.
+    A file is ready when it is pending, listed in the execution order and all its
+    dependencies are completed; the queue pops ready files in execution order.
+    """
+    
+    def __init__(self, files: list[FileSpec], execution_order: list[str]):
+        self.by_id: dict[str, FileSpec] = {}
+        for f in files:
+            self.by_id.setdefault(f.id, f)
+        self.position: dict[str, int] = {}
+        for i, file_id in enumerate(execution_order):
+            self.position.setdefault(file_id, i)
+        self.counts = Counter(f.status for f in files)
+        
+        # Unknown dependency ids never complete, so files depending on them never become ready
+        self.dependents: dict[str, list[str]] = defaultdict(list)
+        self.waiting: dict[str, int] = {}
+        for f in self.by_id.values():
+            waiting = 0
+            for dep_id in f.dependencies:
+                self.dependents[dep_id].append(f.id)
+                dep = self.by_id.get(dep_id)
+                if dep is None or dep.status != TaskStatus.COMPLETED:
+                    waiting += 1
+            self.waiting[f.id] = waiting
+        
+        self.ready: list[tuple[int, str]] = []
+        self.queued: set[str] = set()
+        for f in self.by_id.values():
+            self.push_if_ready(f)
+    
+    def is_ready(self, file_id: str) -> bool:
+        return self.by_id[file_id].status == TaskStatus.PENDING and self.waiting[file_id] == 0
+    
+    def push_if_ready(self, f: FileSpec) -> None:
+        if f.id in self.position and f.id not in self.queued and self.is_ready(f.id):
+            heapq.heappush(self.ready, (self.position[f.id], f.id))
+            self.queued.add(f.id)
+    
+    def set_status(self, f: FileSpec, status: TaskStatus) -> None:
+        if f.status == status:
+            return
+        previous = f.status
+        self.counts[previous] -= 1
+        self.counts[status] += 1
+        f.status = status
+        
+        if TaskStatus.COMPLETED in (previous, status):
+            delta = -1 if status == TaskStatus.COMPLETED else 1
+            for dependent_id in self.dependents.get(f.id, ()):
+                self.waiting[dependent_id] += delta
+                self.push_if_ready(self.by_id[dependent_id])
+        self.push_if_ready(f)
+    
+    def peek(self) -> Optional[FileSpec]:
+        # Entries go stale when a queued file starts running or a dependency is un-completed
+        while self.ready:
+            file_id = self.ready[0][1]
+            if self.is_ready(file_id):
+                return self.by_id[file_id]
+            heapq.heappop(self.ready)
+            self.queued.discard(file_id)
+        return None
+    
+    def ready_files(self) -> list[FileSpec]:
+        self.ready = sorted(entry for entry in self.ready if self.is_ready(entry[1]))
+        self.queued = {file_id for _, file_id in self.ready}
+        return [self.by_id[file_id] for _, file_id in self.ready]
 
 
 class Checkpoint(BaseModel):
@@ -64,22 +191,82 @@ class Checkpoint(BaseModel):
     completed_count: int = Field(default=0)
     failed_count: int = Field(default=0)
     
-    def save(self, path: str | Path) -> None:
-        """Save checkpoint to disk."""
+    _schedule: Optional[_Schedule] = PrivateAttr(default=None)
+    _schedule_key: Optional[tuple] = PrivateAttr(default=None)
+    
+    # Journal state: transitions not yet saved, and what is on disk since the last save or load
+    _pending: list[dict] = PrivateAttr(default_factory=list)
+    _saved_key: Optional[tuple] = PrivateAttr(default=None)
+    _snapshot_bytes: int = PrivateAttr(default=0)
+    _journal_bytes: int = PrivateAttr(default=0)
+    # Stamp of the files as this instance last wrote or read them; another writer changes it
+    _disk_stamp: Optional[tuple] = PrivateAttr(default=None)
+    # _file_state() of each FileSpec (by object id) as last saved, loaded or journaled
+    _saved_state: dict[int, tuple] = PrivateAttr(default_factory=dict)
+    
+    def save(self, path: str | Path, compact: bool = False) -> None:
+        """
+        Save checkpoint to disk.
+        Appends the transitions since the last save to the journal when possible.
+        FileSpec fields edited in place (not through the mark_* methods) cannot be
+        journaled; they are detected and written with a full snapshot, as is
+        everything when `compact=True`.
+        """
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
-        self.updated_at = datetime.now().isoformat()
-        self._update_counts()
-        path.write_text(self.model_dump_json(indent=2))
+        
+        with checkpoint_lock(path):
+            if self._disk_stamp is not None and path.exists() and self._disk_stamp != _source_stamp(path):
+                # Another process or instance saved since this one loaded; writing now would drop its changes
+                self._merge_from_disk(path)
+            edited = self._edited_files()
+            if CHECKPOINT_JOURNAL and not compact and not edited and self._can_append(path):
+                self._update_counts()
+                self._append_journal(path)
+            else:
+                # In-place edits may have changed statuses behind the scheduler index
+                self.reindex()
+                self._update_counts()
+                self.updated_at = datetime.now().isoformat()
+                self._write_snapshot(path)
+            self._disk_stamp = _source_stamp(path)
+            self._write_summary(path)
     
     @classmethod
     def load(cls, path: str | Path) -> "Checkpoint":
-        """Load checkpoint from disk."""
+        """Load checkpoint from disk, replaying its journal over the snapshot."""
         path = Path(path)
         if not path.exists():
             raise FileNotFoundError(f"Checkpoint not found: {path}")
-        data = json.loads(path.read_text())
-        return cls.model_validate(data)
+        # Shared lock: a concurrent compaction must not swap the snapshot between the two reads
+        with checkpoint_lock(path, shared=True):
+            return cls._read(path)
+    
+    @classmethod
+    def _read(cls, path: Path) -> "Checkpoint":
+        # Caller holds the checkpoint lock
+        raw = path.read_text()
+        checkpoint = cls.model_validate(json.loads(raw))
+        checkpoint._snapshot_bytes = len(raw)
+        
+        journal_path = _journal_path(path)
+        if journal_path.exists():
+            with open(journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        record = None
+                    if record is None:
+                        # A torn final line from a crash mid-append; everything before it is intact
+                        break
+                    checkpoint._apply(record)
+                    checkpoint._journal_bytes += len(line)
+            checkpoint._update_counts()
+        checkpoint._disk_stamp = _source_stamp(path)
+        checkpoint._saved_key = checkpoint._structure_key(path)
+        checkpoint._saved_state = {id(f): _file_state(f) for f in checkpoint.files}
+        return checkpoint
     
     @classmethod
     def load_or_create(cls, path: str | Path, project_name: str = "") -> "Checkpoint":
@@ -89,18 +276,178 @@ class Checkpoint(BaseModel):
             return cls.load(path)
         return cls(project_name=project_name)
     
+    def _merge_from_disk(self, path: Path) -> None:
+        """
+        Take the other writer's file states from disk, then re-apply this instance's
+        unsaved transitions and in-place edits on top. Caller holds the exclusive lock.
+        """
+        disk = type(self)._read(path)
+        if _structure(disk) != _structure(self):
+            raise CheckpointConflictError(
+                f"Checkpoint {path} was restructured by another writer, or by this one while another saved"
+            )
+        edited = {id(f) for f in self._edited_files()}
+        for f, theirs in zip(self.files, disk.files):
+            if id(f) in edited:
+                continue
+            f.status = theirs.status
+            f.attempts = theirs.attempts
+            f.last_error = theirs.last_error
+            f.content_ref = theirs.content_ref
+            f.content_size = theirs.content_size
+            self._saved_state[id(f)] = _file_state(f)
+        self.reindex()
+        for record in self._pending:
+            f = self.get_file_by_id(record["id"])
+            if f is not None and id(f) not in edited:
+                self._apply(record)
+        
+        self._snapshot_bytes = disk._snapshot_bytes
+        self._journal_bytes = disk._journal_bytes
+        self._disk_stamp = disk._disk_stamp
+    
+    def _structure_key(self, path: Path) -> tuple:
+        # Everything a journal record cannot express; if any of it changed, the next save writes a snapshot
+        return (
+            str(path),
+            id(self.files),
+            len(self.files),
+            id(self.execution_order),
+            len(self.execution_order),
+            self.project_name,
+            hash(self.global_context)
+        )
+    
+    def _can_append(self, path: Path) -> bool:
+        # Appending on top of another process's writes would interleave two histories; snapshot instead
+        return (
+            self._saved_key == self._structure_key(path)
+            and path.exists()
+            and self._disk_stamp == _source_stamp(path)
+            and self._journal_bytes <= max(CHECKPOINT_COMPACT_BYTES, self._snapshot_bytes)
+            and not self.is_complete()
+        )
+    
+    def _append_journal(self, path: Path) -> None:
+        if not self._pending:
+            return
+        data = "".join(json.dumps(record) + "\n" for record in self._pending).encode("utf-8")
+        with open(_journal_path(path), "ab") as f:
+            if f.tell() != self._journal_bytes:
+                # Drop a torn tail left by a crash so the new records start on a line of their own
+                f.truncate(self._journal_bytes)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_bytes += len(data)
+        self._pending.clear()
+    
+    def _write_snapshot(self, path: Path) -> None:
+        data = self.model_dump_json(indent=2)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_dir(path.parent)
+        # Replaying records the snapshot already contains is harmless, so a crash before this unlink is safe
+        _journal_path(path).unlink(missing_ok=True)
+        
+        self._snapshot_bytes = len(data)
+        self._journal_bytes = 0
+        self._pending.clear()
+        self._saved_key = self._structure_key(path)
+        self._saved_state = {id(f): _file_state(f) for f in self.files}
+    
+    def _write_summary(self, path: Path) -> None:
+        # Written after the snapshot/journal; a crash in between leaves a stale stamp, which readers detect
+        summary = {**self.summary(), "source": list(_source_stamp(path))}
+        summary_path = _summary_path(path)
+        tmp_path = summary_path.with_name(summary_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(summary), encoding="utf-8")
+        os.replace(tmp_path, summary_path)
+    
+    def summary(self) -> dict:
+        """Status counts and the next file to generate, without any file contents."""
+        counts = self._get_schedule().counts
+        next_pending = self.get_next_pending()
+        return {
+            "version": SUMMARY_VERSION,
+            "project_id": self.project_id,
+            "project_name": self.project_name,
+            "updated_at": self.updated_at,
+            "total_files": len(self.files),
+            "completed": counts[TaskStatus.COMPLETED],
+            "failed": counts[TaskStatus.FAILED],
+            "running": counts[TaskStatus.RUNNING],
+            "is_complete": self.is_complete(),
+            "current_file": next_pending.file if next_pending else None
+        }
+    
+    def _record(self, op: str, file_id: str, **fields) -> None:
+        record = {"op": op, "id": file_id, "ts": datetime.now().isoformat(), **fields}
+        self._apply(record)
+        self._pending.append(record)
+    
+    def _apply(self, record: dict) -> None:
+        """Apply one status transition; records carry absolute values so replaying is idempotent."""
+        f = self.get_file_by_id(record["id"])
+        if f is None:
+            return
+        # A file edited in place before this transition stays edited, so the next save snapshots it
+        clean = self._saved_state.get(id(f)) == _file_state(f)
+        op = record["op"]
+        schedule = self._get_schedule()
+        if op == "running":
+            f.attempts = record.get("attempts", f.attempts + 1)
+            schedule.set_status(f, TaskStatus.RUNNING)
+        elif op == "completed":
+            if "content" in record:
+                # Journals written before the blob store carried the content inline
+                content = record["content"]
+                f.content_ref = put_text(content)
+                f.content_size = len(content.encode("utf-8")) if content is not None else None
+            else:
+                f.content_ref = record.get("content_ref")
+                f.content_size = record.get("content_size")
+            f.last_error = None
+            schedule.set_status(f, TaskStatus.COMPLETED)
+        elif op == "failed":
+            f.last_error = record.get("error")
+            schedule.set_status(f, TaskStatus.FAILED)
+        elif op == "retry":
+            schedule.set_status(f, TaskStatus.PENDING)
+        if clean:
+            self._saved_state[id(f)] = _file_state(f)
+        self.updated_at = record.get("ts", self.updated_at)
+    
+    def _edited_files(self) -> list[FileSpec]:
+        """Files changed since the last save or load by anything other than a journaled transition."""
+        return [f for f in self.files if self._saved_state.get(id(f)) != _file_state(f)]
+    
+    def _get_schedule(self) -> _Schedule:
+        """The scheduler index, rebuilt when `files` or `execution_order` were replaced or resized."""
+        key = (id(self.files), len(self.files), id(self.execution_order), len(self.execution_order))
+        if self._schedule is None or self._schedule_key != key:
+            self._schedule = _Schedule(self.files, self.execution_order)
+            self._schedule_key = key
+        return self._schedule
+    
+    def reindex(self) -> None:
+        """Rebuild the scheduler index, e.g. after changing FileSpec statuses without the mark_* methods."""
+        self._schedule = None
+    
     def _update_counts(self) -> None:
         """Update completion counters."""
+        counts = self._get_schedule().counts
         self.total_files = len(self.files)
-        self.completed_count = sum(1 for f in self.files if f.status == TaskStatus.COMPLETED)
-        self.failed_count = sum(1 for f in self.files if f.status == TaskStatus.FAILED)
+        self.completed_count = counts[TaskStatus.COMPLETED]
+        self.failed_count = counts[TaskStatus.FAILED]
     
     def get_file_by_id(self, file_id: str) -> Optional[FileSpec]:
         """Get a file by its ID."""
-        for f in self.files:
-            if f.id == file_id:
-                return f
-        return None
+        return self._get_schedule().by_id.get(file_id)
     
     def is_file_completed(self, file_id: str) -> bool:
         """Check if a file is completed."""
@@ -112,56 +459,37 @@ class Checkpoint(BaseModel):
         Get the next file to execute based on execution order.
         Only returns files whose dependencies are all completed.
         """
-        for file_id in self.execution_order:
-            f = self.get_file_by_id(file_id)
-            if f is None or f.status != TaskStatus.PENDING:
-                continue
-            
-            # Check if all dependencies are completed
-            deps_satisfied = all(
-                self.is_file_completed(dep_id)
-                for dep_id in f.dependencies
-            )
-            
-            if deps_satisfied:
-                return f
-        
-        return None
+        return self._get_schedule().peek()
+    
+    def get_ready_files(self) -> list[FileSpec]:
+        """All pending files whose dependencies are completed, in execution order (for parallel execution)."""
+        return self._get_schedule().ready_files()
     
     def mark_running(self, file_id: str) -> None:
         """Mark a file as currently running."""
         f = self.get_file_by_id(file_id)
         if f:
-            f.status = TaskStatus.RUNNING
-            f.attempts += 1
+            self._record("running", file_id, attempts=f.attempts + 1)
     
     def mark_completed(self, file_id: str, content: str = "") -> None:
         """Mark a file as successfully completed."""
-        f = self.get_file_by_id(file_id)
-        if f:
-            f.status = TaskStatus.COMPLETED
-            f.generated_content = content
-            f.last_error = None
+        if self.get_file_by_id(file_id):
+            self._record("completed", file_id, content_ref=put_text(content), content_size=len(content.encode("utf-8")))
     
     def mark_failed(self, file_id: str, error: str) -> None:
         """Mark a file as failed."""
-        f = self.get_file_by_id(file_id)
-        if f:
-            f.status = TaskStatus.FAILED
-            f.last_error = error
+        if self.get_file_by_id(file_id):
+            self._record("failed", file_id, error=error)
     
     def reset_for_retry(self, file_id: str) -> None:
         """Reset a failed file to pending for retry."""
-        f = self.get_file_by_id(file_id)
-        if f:
-            f.status = TaskStatus.PENDING
+        if self.get_file_by_id(file_id):
+            self._record("retry", file_id)
     
     def is_complete(self) -> bool:
         """Check if all files are completed or failed."""
-        return all(
-            f.status in (TaskStatus.COMPLETED, TaskStatus.FAILED)
-            for f in self.files
-        )
+        counts = self._get_schedule().counts
+        return counts[TaskStatus.COMPLETED] + counts[TaskStatus.FAILED] == len(self.files)
     
     def get_progress(self) -> str:
         """Get a human-readable progress string."""
@@ -169,7 +497,190 @@ class Checkpoint(BaseModel):
         return f"{self.completed_count}/{self.total_files} completed, {self.failed_count} failed"
 
 
+def _structure(checkpoint: Checkpoint) -> tuple:
+    # Everything but the per-file execution state, which two writers can merge
+    return (
+        checkpoint.project_name,
+        checkpoint.global_context,
+        tuple(checkpoint.execution_order),
+        tuple(_file_definition(f) for f in checkpoint.files)
+    )
+
+
+def _file_definition(f: FileSpec) -> tuple:
+    return (f.id, f.file, f.file_type, f.description, f.content_spec, tuple(f.dependencies))
+
+
+def _file_state(f: FileSpec) -> tuple:
+    return (*_file_definition(f), f.status, f.attempts, f.last_error, f.content_ref, f.content_size)
+
+
+def _journal_path(path: Path) -> Path:
+    return path.with_name(path.name + ".journal")
+
+
+def _summary_path(path: Path) -> Path:
+    return path.with_name(path.name + ".summary")
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Makes the rename durable; not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+_thread_locks: dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+@contextmanager
+def checkpoint_lock(path: str | Path, shared: bool = False):
+    """
+    Lock one checkpoint against other threads and processes.
+    Uses flock on `<checkpoint>.lock` where available; threads of one process
+    are serialized by an in-process lock as well.
+    """
+    path = Path(path)
+    with _thread_locks_guard:
+        thread_lock = _thread_locks.setdefault(str(path.resolve()), threading.Lock())
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_name(path.name + ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _source_stamp(path: Path) -> tuple:
+    """(mtime_ns, size) of the snapshot and journal; changes whenever either is written."""
+    snapshot = path.stat()
+    try:
+        journal = _journal_path(path).stat()
+        journal_stamp = (journal.st_mtime_ns, journal.st_size)
+    except FileNotFoundError:
+        journal_stamp = (0, 0)
+    return (snapshot.st_mtime_ns, snapshot.st_size, *journal_stamp)
+
+
+_summary_cache: dict[str, tuple[tuple, dict]] = {}
+_summary_lock = threading.Lock()
+
+
+def load_summary(path: str | Path) -> dict:
+    """
+    Checkpoint.summary() for the checkpoint at `path`, from the sidecar written by
+    `save` or a per-process cache. Falls back to a full load when the sidecar is
+    missing or stale (older checkpoints, or a crash between the two writes).
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Checkpoint not found: {path}")
+    stamp = _source_stamp(path)
+    with _summary_lock:
+        cached = _summary_cache.get(str(path))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    
+    summary = None
+    try:
+        data = json.loads(_summary_path(path).read_text(encoding="utf-8"))
+        if data.get("version") == SUMMARY_VERSION and data.get("source") == list(stamp):
+            summary = data
+    except (OSError, ValueError):
+        pass
+    if summary is None:
+        summary = Checkpoint.load(path).summary()
+    
+    with _summary_lock:
+        _summary_cache[str(path)] = (stamp, summary)
+    return summary
+
+
+_file_paths_cache: dict[str, tuple[tuple, list[str]]] = {}
+
+
+def load_file_paths(path: str | Path) -> list[str]:
+    """
+    Paths of the files in the checkpoint at `path`. Journal records never add,
+    remove or rename files, so only the snapshot is read, and only when it changed.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Checkpoint not found: {path}")
+    with checkpoint_lock(path, shared=True):
+        snapshot = path.stat()
+        stamp = (snapshot.st_mtime_ns, snapshot.st_size)
+        with _summary_lock:
+            cached = _file_paths_cache.get(str(path))
+        if cached is not None and cached[0] == stamp:
+            return list(cached[1])
+        files = [f["file"] for f in json.loads(path.read_text()).get("files", [])]
+    
+    with _summary_lock:
+        _file_paths_cache[str(path)] = (stamp, files)
+    return list(files)
+
+
+def _safe_filename(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+
+
 def get_checkpoint_path(project_name: str, base_dir: str = ".appbuilder") -> Path:
     """Get the checkpoint file path for a project."""
-    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in project_name)
-    return Path(base_dir) / "checkpoints" / f"{safe_name}.json"
+    return Path(base_dir) / "checkpoints" / f"{_safe_filename(project_name)}.json"
+
+
+_ID_FILENAME = re.compile(r"[A-Za-z0-9-]+")
+
+
+def _id_filename(project_id: str) -> str:
+    # UUIDs and slugs are used as-is; anything else is hex-encoded behind a "_" (which no slug
+    # contains), so two distinct ids never share a file
+    if _ID_FILENAME.fullmatch(project_id):
+        return project_id
+    return "_" + project_id.encode("utf-8").hex()
+
+
+def _filename_id(stem: str) -> Optional[str]:
+    """The project id a checkpoint file name encodes, or None for name-keyed checkpoints."""
+    if _ID_FILENAME.fullmatch(stem):
+        return stem
+    try:
+        project_id = bytes.fromhex(stem[1:]).decode("utf-8") if stem.startswith("_") else None
+    except ValueError:
+        return None
+    return project_id if project_id is not None and _id_filename(project_id) == stem else None
+
+
+def get_project_checkpoint_path(project_id: str, base_dir: str = ".appbuilder") -> Path:
+    """Get the checkpoint file path for a project, keyed by its id."""
+    return Path(base_dir) / "checkpoints" / f"{_id_filename(project_id)}.json"
+
+
+def list_checkpoints(base_dir: str = ".appbuilder") -> dict[str, Path]:
+    """Project id -> path of every id-keyed checkpoint under `base_dir` (name-keyed ones are skipped)."""
+    checkpoints = {}
+    for path in sorted((Path(base_dir) / "checkpoints").glob("*.json")):
+        # Filter by name first: name-keyed checkpoints have no sidecar, so reading one means a full load
+        project_id = _filename_id(path.stem)
+        if project_id is None:
+            continue
+        try:
+            if load_summary(path)["project_id"] == project_id:
+                checkpoints[project_id] = path
+        except (OSError, ValueError):
+            continue
+    return checkpoints
@@ -1,20 +1,33 @@
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from typing import Optional
 
-from langchain_groq import ChatGroq
-from langgraph.prebuilt import create_react_agent
-
-from agent.states import CoderState, TaskPlan, FileDiff
+from agent.states import CoderState, TaskPlan, FileDiff, ImplementationTask, GeneratedFile
 from agent.tools import write_file, read_file, list_files
-from agent.knowledge_base.kb_manager import KnowledgeBaseManager
+from agent.llm_gateway import get_llm
+from agent.agent_registry import get_react_agent, get_structured_llm
+from agent.context_packer import pack_snippets, trim_to_tokens, CODER_CONTEXT_TOKENS, CODER_DEPENDENCY_TOKENS
+from agent.knowledge_base.kb_manager import get_kb_manager
+
 
+coding_llm = get_llm(temperature=0)
 
-coding_llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0)
+CODER_MAX_CONCURRENCY = int(os.getenv("CODER_MAX_CONCURRENCY", "4"))
+CODER_STRATEGY = os.getenv("CODER_STRATEGY", "react")
+MAX_TASK_RETRIES = 2
+MAX_CONTEXT_ROUNDS = 1
+
+_FILE_REFERENCE_PATTERN = re.compile(r"[\w@./-]+\.[A-Za-z0-9]+")
 
 
 def coder_agent_v2(state: dict) -> dict:
     coder_state: CoderState = state.get("coder_state")
     plan = state.get("plan")
+    strategy = state.get("coder_strategy") or CODER_STRATEGY
     
     if coder_state is None:
         coder_state = CoderState(task_plan=state["task_plan"], current_step_idx=0)
@@ -30,38 +43,16 @@ def coder_agent_v2(state: dict) -> dict:
 
     current_task = steps[coder_state.current_step_idx]
     
-    tech = _detect_tech_from_file(current_task.filepath, plan)
-    patterns = _get_code_patterns(tech, current_task.task_description)
-    
-    existing_content = read_file.invoke({"path": current_task.filepath})
-    
-    before_content = existing_content if existing_content else None
-    
-    prompt = _build_coder_prompt(current_task, patterns, existing_content, plan)
-    
-    coder_tools = [read_file, write_file, list_files]
-    
-    agent = create_react_agent(coding_llm, coder_tools)
+    before_content, prompt = _prepare_task(current_task, plan, strategy)
     
     try:
-        messages = [
-            {"role": "system", "content": prompt["system"]},
-            {"role": "user", "content": prompt["user"]}
-        ]
-        agent.invoke({"messages": messages})
+        _invoke_coder(current_task, prompt, strategy)
     except Exception as e:
-        if coder_state.retry_count < 2:
+        if coder_state.retry_count < MAX_TASK_RETRIES:
             coder_state.retry_count += 1
             return {"coder_state": coder_state, "error": str(e)}
     
-    after_content = read_file.invoke({"path": current_task.filepath})
-    
-    diff = FileDiff(
-        filepath=current_task.filepath,
-        before_content=before_content,
-        after_content=after_content,
-        status="modified" if before_content else "created"
-    )
+    diff = _collect_diff(current_task.filepath, before_content)
     
     file_diffs = state.get("file_diffs", [])
     file_diffs.append(diff)
@@ -72,6 +63,189 @@ def coder_agent_v2(state: dict) -> dict:
     return {"coder_state": coder_state, "file_diffs": file_diffs}
 
 
+def coder_agent_v2_parallel(state: dict) -> dict:
+    """Implements every remaining step, running steps with no pending dependencies concurrently."""
+    coder_state: CoderState = state.get("coder_state")
+    plan = state.get("plan")
+    max_concurrency = state.get("coder_max_concurrency") or CODER_MAX_CONCURRENCY
+    strategy = state.get("coder_strategy") or CODER_STRATEGY
+    
+    if coder_state is None:
+        coder_state = CoderState(task_plan=state["task_plan"], current_step_idx=0)
+
+    steps = coder_state.task_plan.implementation_steps
+    start = coder_state.current_step_idx
+    
+    dependencies = build_task_dag(steps)
+    waiting_on = {i: {d for d in dependencies[i] if d >= start} for i in range(start, len(steps))}
+    dependents = defaultdict(list)
+    for i, deps in waiting_on.items():
+        for d in deps:
+            dependents[d].append(i)
+
+    diffs: dict[int, FileDiff] = {}
+    errors = []
+    
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        running = {
+            executor.submit(_implement_task, steps[i], plan, strategy): i
+            for i, deps in waiting_on.items() if not deps
+        }
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = running.pop(future)
+                try:
+                    diffs[idx] = future.result()
+                except Exception as e:
+                    errors.append({"filepath": steps[idx].filepath, "error": str(e)})
+                
+                for dependent in dependents[idx]:
+                    waiting_on[dependent].discard(idx)
+                    if not waiting_on[dependent]:
+                        running[executor.submit(_implement_task, steps[dependent], plan, strategy)] = dependent
+
+    file_diffs = state.get("file_diffs", [])
+    file_diffs.extend(diffs[i] for i in sorted(diffs))
+    
+    coder_state.current_step_idx = len(steps)
+    coder_state.retry_count = 0
+
+    return {
+        "coder_state": coder_state,
+        "status": "DONE",
+        "file_diffs": file_diffs,
+        "coder_errors": errors
+    }
+
+
+def build_task_dag(steps: list[ImplementationTask]) -> list[set[int]]:
+    """Map each step to the earlier steps it waits for (same file, depends_on, files named in the task)."""
+    by_path = defaultdict(list)
+    by_name = defaultdict(list)
+    dependencies = []
+
+    for i, step in enumerate(steps):
+        path = _normalize_path(step.filepath)
+        references = {_normalize_path(p) for p in step.depends_on}
+        references.update(_normalize_path(m) for m in _FILE_REFERENCE_PATTERN.findall(step.task_description))
+        references.add(path)
+        
+        deps = set()
+        for ref in references:
+            deps.update(by_path.get(ref, []))
+            if "/" not in ref:
+                deps.update(by_name.get(ref, []))
+        dependencies.append(deps)
+        
+        by_path[path].append(i)
+        by_name[Path(path).name].append(i)
+
+    return dependencies
+
+
+def _normalize_path(path: str) -> str:
+    path = path.strip().strip("`'\"").replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path.lstrip("/")
+
+
+def _implement_task(task: ImplementationTask, plan, strategy: str = CODER_STRATEGY) -> FileDiff:
+    before_content, prompt = _prepare_task(task, plan, strategy)
+    
+    for attempt in range(MAX_TASK_RETRIES + 1):
+        try:
+            _invoke_coder(task, prompt, strategy)
+            break
+        except Exception:
+            if attempt == MAX_TASK_RETRIES:
+                # Surfaces in coder_errors; a FileDiff here would record an unwritten file as created
+                raise
+            time.sleep(2 ** attempt)
+    
+    return _collect_diff(task.filepath, before_content)
+
+
+def _prepare_task(task: ImplementationTask, plan, strategy: str = CODER_STRATEGY) -> tuple[Optional[str], dict]:
+    tech = _detect_tech_from_file(task.filepath, plan)
+    patterns = _get_code_patterns(tech, task.task_description)
+    
+    existing_content = read_file.invoke({"path": task.filepath})
+    before_content = existing_content if existing_content else None
+    
+    if strategy == "structured":
+        dependency_contents = _read_dependencies(task)
+        return before_content, _build_structured_coder_prompt(task, patterns, existing_content, plan, dependency_contents)
+    
+    return before_content, _build_coder_prompt(task, patterns, existing_content, plan)
+
+
+def _invoke_coder(task: ImplementationTask, prompt: dict, strategy: str = CODER_STRATEGY) -> None:
+    if strategy == "structured":
+        _invoke_structured_coder(task, prompt)
+    else:
+        _invoke_react_coder(prompt)
+
+
+def _invoke_structured_coder(task: ImplementationTask, prompt: dict) -> None:
+    """Ask for the whole file in one structured response and write it ourselves."""
+    messages = [
+        {"role": "system", "content": prompt["system"]},
+        {"role": "user", "content": prompt["user"]}
+    ]
+    provided = set(prompt.get("provided_files", []))
+    structured_llm = get_structured_llm(coding_llm, GeneratedFile)
+    
+    for round_idx in range(MAX_CONTEXT_ROUNDS + 1):
+        result = structured_llm.invoke(messages)
+        if result is None:
+            raise ValueError("Coder did not return a valid response")
+        
+        requested = [p for p in result.needs_files if _normalize_path(p) not in provided]
+        if result.content or not requested or round_idx == MAX_CONTEXT_ROUNDS:
+            break
+        
+        requested_text = []
+        for path in requested:
+            provided.add(_normalize_path(path))
+            content = read_file.invoke({"path": _normalize_path(path)})
+            requested_text.append(f"### {path}\n```\n{content if content else '(file does not exist yet)'}\n```")
+        messages.append({"role": "assistant", "content": result.model_dump_json()})
+        messages.append({
+            "role": "user",
+            "content": "REQUESTED FILES:\n" + "\n\n".join(requested_text) + "\n\nNow return the complete file content."
+        })
+    
+    if not result.content:
+        raise ValueError(f"Coder returned no content for {task.filepath}")
+    
+    write_file.invoke({"path": task.filepath, "content": result.content})
+
+
+def _invoke_react_coder(prompt: dict) -> None:
+    coder_tools = [read_file, write_file, list_files]
+    
+    agent = get_react_agent(coding_llm, coder_tools)
+    
+    messages = [
+        {"role": "system", "content": prompt["system"]},
+        {"role": "user", "content": prompt["user"]}
+    ]
+    agent.invoke({"messages": messages})
+
+
+def _collect_diff(filepath: str, before_content: Optional[str]) -> FileDiff:
+    after_content = read_file.invoke({"path": filepath})
+    
+    return FileDiff(
+        filepath=filepath,
+        before_content=before_content,
+        after_content=after_content,
+        status="modified" if before_content else "created"
+    )
+
+
 def _detect_tech_from_file(filepath: str, plan) -> Optional[str]:
     if not plan:
         return None
@@ -100,23 +274,27 @@ def _get_code_patterns(tech: Optional[str], task_description: str) -> list:
         return []
     
     try:
-        kb = KnowledgeBaseManager()
+        kb = get_kb_manager()
         return kb.query_single_tech(tech, task_description, n_results=2)
     except Exception:
         return []
 
 
+def _read_dependencies(task: ImplementationTask) -> dict[str, str]:
+    contents = {}
+    for path in task.depends_on:
+        path = _normalize_path(path)
+        if path == _normalize_path(task.filepath) or path in contents:
+            continue
+        content = read_file.invoke({"path": path})
+        if content:
+            contents[path] = trim_to_tokens(content, CODER_DEPENDENCY_TOKENS)
+    return contents
+
+
 def _build_coder_prompt(task, patterns: list, existing_content: str, plan) -> dict:
-    patterns_text = ""
-    if patterns:
-        patterns_text = "\n\nPRODUCTION PATTERNS TO ADAPT:\n"
-        for p in patterns[:2]:
-            code = p.get("code", "")[:600]
-            patterns_text += f"```\n{code}\n```\n"
-
-    global_context = ""
-    if plan and hasattr(plan, 'files'):
-        global_context = f"\n\nPROJECT FILES:\n{[f.path for f in plan.files]}"
+    patterns_text = _format_code_patterns(patterns)
+    global_context = _format_project_files(plan)
 
     system = f"""You are an expert coder with 15+ years of AI engineering experience.
 
@@ -140,3 +318,60 @@ EXISTING CONTENT:
 Implement the complete file. Use write_file to save."""
 
     return {"system": system, "user": user}
+
+
+def _build_structured_coder_prompt(task, patterns: list, existing_content: str, plan, dependency_contents: dict) -> dict:
+    patterns_text = _format_code_patterns(patterns)
+    global_context = _format_project_files(plan)
+    
+    dependencies_text = ""
+    if dependency_contents:
+        dependencies_text = "\n\nFILES THIS ONE DEPENDS ON:\n" + "\n\n".join(
+            f"### {path}\n```\n{content}\n```" for path, content in dependency_contents.items()
+        )
+
+    system = f"""You are an expert coder with 15+ years of AI engineering experience.
+
+RULES:
+- NO unnecessary comments (only for complex logic)
+- Clean, self-documenting code
+- Proper error handling and type hints
+- Follow SOLID and DRY principles
+- Use meaningful variable/function names
+{patterns_text}
+{global_context}
+
+Respond with the file path and the COMPLETE file content.
+Only if you cannot write the file without reading another project file that is not shown,
+list those paths in needs_files and leave content empty."""
+
+    user = f"""TASK: {task.task_description}
+FILE: {task.filepath}
+{dependencies_text}
+
+EXISTING CONTENT:
+{existing_content if existing_content else '(new file)'}
+
+Implement the complete file."""
+
+    return {
+        "system": system,
+        "user": user,
+        "provided_files": [_normalize_path(task.filepath), *dependency_contents.keys()]
+    }
+
+
+def _format_code_patterns(patterns: list) -> str:
+    if not patterns:
+        return ""
+    
+    patterns_text = "\n\nPRODUCTION PATTERNS TO ADAPT:\n"
+    for p in pack_snippets(patterns, CODER_CONTEXT_TOKENS, max_snippets=2):
+        patterns_text += f"```\n{p['code']}\n```\n"
+    return patterns_text
+
+
+def _format_project_files(plan) -> str:
+    if plan and hasattr(plan, 'files'):
+        return f"\n\nPROJECT FILES:\n{[f.path for f in plan.files]}"
+    return ""
@@ -0,0 +1,162 @@
+"""
+Token-budgeted packing of knowledge-base snippets into prompts.
+
+Snippets are ranked by relevance_score, near-duplicates are dropped, and each
+kept snippet is trimmed at a syntax boundary (blank line, closing brace,
+top-level statement) so the whole group fits a per-stage token budget.
+"""
+
+import os
+import re
+from typing import Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+PLANNER_CONTEXT_TOKENS = int(os.getenv("PLANNER_CONTEXT_TOKENS", "500"))
+ARCHITECT_CONTEXT_TOKENS = int(os.getenv("ARCHITECT_CONTEXT_TOKENS", "300"))
+# Per-file examples get ARCHITECT_FILE_TOKENS each (the old 400-char cut), up to ARCHITECT_FILE_CONTEXT_TOKENS in total
+ARCHITECT_FILE_TOKENS = int(os.getenv("ARCHITECT_FILE_TOKENS", "100"))
+ARCHITECT_FILE_CONTEXT_TOKENS = int(os.getenv("ARCHITECT_FILE_CONTEXT_TOKENS", "4000"))
+CODER_CONTEXT_TOKENS = int(os.getenv("CODER_CONTEXT_TOKENS", "300"))
+CODER_DEPENDENCY_TOKENS = int(os.getenv("CODER_DEPENDENCY_TOKENS", "1000"))
+
+MIN_SNIPPET_TOKENS = 40
+DUPLICATE_THRESHOLD = 0.8
+
+_CLOSING_LINE = re.compile(r"^\s*[}\])]+[;,)]*\s*$|^\s*</\w+>\s*$")
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def trim_to_tokens(code: str, max_tokens: int) -> str:
+    """Cut `code` to at most `max_tokens`, ending on the last syntax boundary that fits."""
+    if count_tokens(code) <= max_tokens:
+        return code
+
+    lines = code.splitlines()
+    kept, used = [], 0
+    for line in lines:
+        cost = count_tokens(line + "\n")
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+
+    if not kept:
+        return code[:max_tokens * 4].rstrip() + "\n..." if max_tokens >= MIN_SNIPPET_TOKENS else ""
+
+    cut = _last_boundary(kept, lines)
+    if cut < len(kept) // 2:
+        cut = len(kept)
+    return "\n".join(kept[:cut]).rstrip() + "\n..."
+
+
+def _last_boundary(kept: list[str], lines: list[str]) -> int:
+    """Number of leading lines to keep so the snippet ends at a complete block."""
+    for i in range(len(kept), 0, -1):
+        line = kept[i - 1]
+        next_line = lines[i] if i < len(lines) else ""
+        if not line.strip() or _CLOSING_LINE.match(line):
+            return i
+        if next_line.strip() and not next_line[0].isspace() and not _CLOSING_LINE.match(next_line):
+            return i
+    return 0
+
+
+def _shingles(text: str, size: int = 5) -> set[int]:
+    tokens = _TOKEN_PATTERN.findall(text)
+    if len(tokens) <= size:
+        return {hash(tuple(tokens))}
+    return {hash(tuple(tokens[i:i + size])) for i in range(len(tokens) - size + 1)}
+
+
+def _is_duplicate(shingles: set[int], seen: list[set[int]], threshold: float) -> bool:
+    for other in seen:
+        overlap = len(shingles & other)
+        if overlap and overlap / len(shingles | other) >= threshold:
+            return True
+    return False
+
+
+def pack_snippets(
+    snippets: list[dict],
+    token_budget: int,
+    max_snippets: Optional[int] = None,
+    threshold: float = DUPLICATE_THRESHOLD
+) -> list[dict]:
+    """Pick and trim snippets (dicts with "code" and "relevance_score") to fit `token_budget`."""
+    return pack_grouped({None: snippets}, token_budget, max_snippets, threshold).get(None, [])
+
+
+def pack_grouped(
+    groups: dict,
+    token_budget: int,
+    max_per_group: Optional[int] = None,
+    threshold: float = DUPLICATE_THRESHOLD
+) -> dict:
+    """Pack several snippet lists (e.g. per tech or per file) against one shared budget.
+
+    Each group first gets its single best snippet, then remaining slots are
+    filled by relevance across all groups. Group order is preserved.
+    """
+    leaders, followers = [], []
+    planned_slots = 0
+    for key, snippets in groups.items():
+        ranked = sorted(
+            (s for s in snippets or [] if s.get("code")),
+            key=lambda s: s.get("relevance_score", 0),
+            reverse=True
+        )
+        if max_per_group is not None:
+            ranked = ranked[:max_per_group]
+        planned_slots += len(ranked)
+        leaders.extend((key, s) for s in ranked[:1])
+        followers.extend((key, s) for s in ranked[1:])
+    followers.sort(key=lambda item: item[1].get("relevance_score", 0), reverse=True)
+
+    remaining = token_budget
+    slots_left = planned_slots
+    seen: list[set[int]] = []
+    packed: dict = {key: [] for key in groups}
+
+    for key, snippet in leaders + followers:
+        if remaining < MIN_SNIPPET_TOKENS:
+            break
+        share = max(MIN_SNIPPET_TOKENS, remaining // max(1, slots_left))
+        slots_left -= 1
+
+        code = snippet["code"]
+        shingles = _shingles(code)
+        if _is_duplicate(shingles, seen, threshold):
+            continue
+
+        trimmed = trim_to_tokens(code, min(share, remaining))
+        if not trimmed:
+            continue
+
+        seen.append(shingles)
+        remaining -= count_tokens(trimmed)
+        packed[key].append({**snippet, "code": trimmed})
+
+    return {key: items for key, items in packed.items() if items}
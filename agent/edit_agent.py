@@ -1,13 +1,12 @@
 from typing import Optional
 
-from langchain_groq import ChatGroq
-from langgraph.prebuilt import create_react_agent
-
 from agent.tools import write_file, read_file
 from agent.file_locator import FileLocator
+from agent.llm_gateway import get_llm
+from agent.agent_registry import get_react_agent
 
 
-edit_llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0)
+edit_llm = get_llm(temperature=0)
 
 
 class EditAgent:
@@ -29,7 +28,7 @@ class EditAgent:
 
         prompt = self._build_edit_prompt(user_message, file_contents, affected_files)
         
-        agent = create_react_agent(edit_llm, self.tools)
+        agent = get_react_agent(edit_llm, self.tools)
         
         try:
             messages = [
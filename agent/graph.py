@@ -1,17 +1,17 @@
 from dotenv import load_dotenv
-from langchain_groq.chat_models import ChatGroq
 from langgraph.constants import END
 from langgraph.graph import StateGraph
-from langgraph.prebuilt import create_react_agent
 from agent.prompts import *
 from agent.states import *
 from agent.tools import write_file, read_file, get_current_directory, list_files
+from agent.llm_gateway import get_llm
+from agent.agent_registry import get_react_agent
 
 _ = load_dotenv()
 
-planning_llm = ChatGroq(model="llama-3.3-70b-versatile")
-architect_llm = ChatGroq(model="llama-3.3-70b-versatile")
-coding_llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0)
+planning_llm = get_llm()
+architect_llm = get_llm()
+coding_llm = get_llm(temperature=0)
 
 
 def planner_agent(state: dict) -> dict:
@@ -61,7 +61,7 @@ def coder_agent(state: dict) -> dict:
     )
 
     coder_tools = [read_file, write_file, list_files, get_current_directory]
-    code_agent = create_react_agent(coding_llm, coder_tools)
+    code_agent = get_react_agent(coding_llm, coder_tools)
 
     code_agent.invoke({"messages": [
         {"role": "system", "content": system_prompt},
@@ -1,8 +1,10 @@
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
-from agent.planner_v2 import planner_agent_v2
+from agent.planner_v2 import planner_agent_v2, aplanner_agent_v2
 from agent.architect_v2 import architect_agent_v2
-from agent.coder_v2 import coder_agent_v2
+from agent.coder_v2 import coder_agent_v2, coder_agent_v2_parallel
+from agent.agent_registry import get_or_build
 
 
 def should_wait_for_plan_review(state: dict) -> str:
@@ -45,13 +47,17 @@ def should_continue_coding(state: dict) -> str:
     return "coder"
 
 
-def build_graph_v2():
+def _coder_node(parallel_coder: bool):
+    return coder_agent_v2_parallel if parallel_coder else coder_agent_v2
+
+
+def build_graph_v2(parallel_coder: bool = False):
     """Build the full v2 graph starting from planner."""
     graph = StateGraph(dict)
     
-    graph.add_node("planner", planner_agent_v2)
+    graph.add_node("planner", RunnableLambda(planner_agent_v2, afunc=aplanner_agent_v2))
     graph.add_node("architect", architect_agent_v2)
-    graph.add_node("coder", coder_agent_v2)
+    graph.add_node("coder", _coder_node(parallel_coder))
     
     graph.set_entry_point("planner")
     
@@ -87,12 +93,12 @@ def build_graph_v2():
     return graph.compile()
 
 
-def build_architect_graph():
+def build_architect_graph(parallel_coder: bool = False):
     """Build a graph starting from architect (for resuming after plan approval)."""
     graph = StateGraph(dict)
     
     graph.add_node("architect", architect_agent_v2)
-    graph.add_node("coder", coder_agent_v2)
+    graph.add_node("coder", _coder_node(parallel_coder))
     
     graph.set_entry_point("architect")
     
@@ -118,11 +124,11 @@ def build_architect_graph():
     return graph.compile()
 
 
-def build_coder_graph():
+def build_coder_graph(parallel_coder: bool = False):
     """Build a graph starting from coder (for resuming after task approval)."""
     graph = StateGraph(dict)
     
-    graph.add_node("coder", coder_agent_v2)
+    graph.add_node("coder", _coder_node(parallel_coder))
     
     graph.set_entry_point("coder")
     
@@ -138,7 +144,20 @@ def build_coder_graph():
     return graph.compile()
 
 
-agent_v2 = build_graph_v2()
+_GRAPH_BUILDERS = {
+    "planner": build_graph_v2,
+    "architect": build_architect_graph,
+    "coder": build_coder_graph
+}
+
+
+def get_compiled_graph(entry: str = "planner", parallel_coder: bool = False):
+    """Return the process-wide compiled graph for an entry point, building it on first use."""
+    builder = _GRAPH_BUILDERS[entry]
+    return get_or_build(("graph_v2", entry, parallel_coder), lambda: builder(parallel_coder=parallel_coder))
+
+
+agent_v2 = get_compiled_graph("planner")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+const { Pool } = require("pg");
+
+const pool = new Pool({
+  connectionString: process.env.DATABASE_URL,
+  max: 10,
+  idleTimeoutMillis: 30000,
+});
+
+// Run a parameterized query against the shared PostgreSQL connection pool
+async function query(text, params) {
+  const started = Date.now();
+  const result = await pool.query(text, params);
+  if (Date.now() - started > 500) {
+    console.warn("Slow query", { text, duration: Date.now() - started });
+  }
+  return result;
+}
+
+// Run `work` inside BEGIN/COMMIT on one client, rolling back if it throws
+async function withTransaction(work) {
+  const client = await pool.connect();
+  try {
+    await client.query("BEGIN");
+    const result = await work(client);
+    await client.query("COMMIT");
+    return result;
+  } catch (err) {
+    await client.query("ROLLBACK");
+    throw err;
+  } finally {
+    client.release();
+  }
+}
+
+module.exports = { pool, query, withTransaction };
@@ -0,0 +1,28 @@
+const jwt = require("jsonwebtoken");
+
+// Verify the Bearer JWT from the Authorization header and attach its claims to req.user
+function authenticate(req, res, next) {
+  const header = req.headers.authorization || "";
+  const [scheme, token] = header.split(" ");
+  if (scheme !== "Bearer" || !token) {
+    return res.status(401).json({ error: "Missing bearer token" });
+  }
+  try {
+    req.user = jwt.verify(token, process.env.JWT_SECRET);
+    return next();
+  } catch (err) {
+    return res.status(401).json({ error: "Invalid or expired token" });
+  }
+}
+
+// Only let users with one of `roles` through; use after authenticate
+function requireRole(...roles) {
+  return (req, res, next) => {
+    if (!req.user || !roles.includes(req.user.role)) {
+      return res.status(403).json({ error: "Forbidden" });
+    }
+    return next();
+  };
+}
+
+module.exports = { authenticate, requireRole };
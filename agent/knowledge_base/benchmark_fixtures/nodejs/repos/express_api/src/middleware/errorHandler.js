@@ -0,0 +1,24 @@
+class HttpError extends Error {
+  constructor(status, message, details) {
+    super(message);
+    this.status = status;
+    this.details = details;
+  }
+}
+
+// Final Express error middleware: logs unexpected errors and sends a JSON error body
+function errorHandler(err, req, res, next) {
+  const status = err.status || 500;
+  if (status >= 500) {
+    console.error(`[${req.method} ${req.originalUrl}]`, err);
+  }
+  res.status(status).json({
+    error: status >= 500 ? "Internal server error" : err.message,
+    details: err.details,
+  });
+}
+
+// Wrap an async route handler so rejected promises reach the error middleware
+const asyncHandler = (fn) => (req, res, next) => Promise.resolve(fn(req, res, next)).catch(next);
+
+module.exports = { HttpError, errorHandler, asyncHandler };
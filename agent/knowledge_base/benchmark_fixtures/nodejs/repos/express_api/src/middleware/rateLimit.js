@@ -0,0 +1,20 @@
+// Fixed-window in-memory rate limiter keyed by client IP
+function rateLimit({ windowMs = 60000, max = 100 } = {}) {
+  const hits = new Map();
+
+  setInterval(() => hits.clear(), windowMs).unref();
+
+  return function rateLimitMiddleware(req, res, next) {
+    const key = req.ip;
+    const count = (hits.get(key) || 0) + 1;
+    hits.set(key, count);
+    res.setHeader("X-RateLimit-Limit", max);
+    res.setHeader("X-RateLimit-Remaining", Math.max(0, max - count));
+    if (count > max) {
+      return res.status(429).json({ error: "Too many requests, slow down" });
+    }
+    return next();
+  };
+}
+
+module.exports = { rateLimit };
@@ -0,0 +1,40 @@
+const express = require("express");
+const bcrypt = require("bcrypt");
+const { body, validationResult } = require("express-validator");
+const { query } = require("../db/pool");
+const { authenticate, requireRole } = require("../middleware/auth");
+const { asyncHandler, HttpError } = require("../middleware/errorHandler");
+
+const router = express.Router();
+
+const validateRegistration = [
+  body("email").isEmail().normalizeEmail(),
+  body("password").isLength({ min: 8 }).withMessage("Password must be at least 8 characters"),
+];
+
+// Create a user account after validating the body and hashing the password
+async function registerUser(req, res) {
+  const errors = validationResult(req);
+  if (!errors.isEmpty()) {
+    throw new HttpError(422, "Validation failed", errors.array());
+  }
+  const hash = await bcrypt.hash(req.body.password, 12);
+  const { rows } = await query(
+    "INSERT INTO users (email, password_hash) VALUES ($1, $2) RETURNING id, email",
+    [req.body.email, hash]
+  );
+  res.status(201).json(rows[0]);
+}
+
+// List users with limit/offset pagination, admins only
+async function listUsers(req, res) {
+  const limit = Math.min(parseInt(req.query.limit, 10) || 20, 100);
+  const offset = parseInt(req.query.offset, 10) || 0;
+  const { rows } = await query("SELECT id, email FROM users ORDER BY id LIMIT $1 OFFSET $2", [limit, offset]);
+  res.json({ users: rows, limit, offset });
+}
+
+router.post("/", validateRegistration, asyncHandler(registerUser));
+router.get("/", authenticate, requireRole("admin"), asyncHandler(listUsers));
+
+module.exports = router;
@@ -0,0 +1,38 @@
+const express = require("express");
+const helmet = require("helmet");
+const cors = require("cors");
+const { errorHandler } = require("./middleware/errorHandler");
+const { rateLimit } = require("./middleware/rateLimit");
+const { pool } = require("./db/pool");
+
+// Build the Express app with security headers, CORS, JSON parsing and routes
+function createApp() {
+  const app = express();
+  app.use(helmet());
+  app.use(cors({ origin: process.env.CORS_ORIGIN || "http://localhost:3000" }));
+  app.use(express.json({ limit: "1mb" }));
+  app.use(rateLimit({ windowMs: 60000, max: 120 }));
+  app.get("/health", (req, res) => res.json({ status: "ok" }));
+  app.use("/api/users", require("./routes/users"));
+  app.use(errorHandler);
+  return app;
+}
+
+// Stop accepting connections on SIGTERM, drain the pool, then exit
+function gracefulShutdown(server) {
+  process.on("SIGTERM", () => {
+    console.log("SIGTERM received, closing server");
+    server.close(async () => {
+      await pool.end();
+      process.exit(0);
+    });
+    setTimeout(() => process.exit(1), 10000).unref();
+  });
+}
+
+if (require.main === module) {
+  const server = createApp().listen(process.env.PORT || 3000);
+  gracefulShutdown(server);
+}
+
+module.exports = { createApp };
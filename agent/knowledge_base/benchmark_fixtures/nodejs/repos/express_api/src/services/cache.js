@@ -0,0 +1,16 @@
+const { createClient } = require("redis");
+
+const client = createClient({ url: process.env.REDIS_URL || "redis://localhost:6379" });
+client.on("error", (err) => console.error("Redis error", err));
+
+// Return the cached JSON value for `key`, or compute, store with a TTL and return it
+async function getOrSet(key, ttlSeconds, compute) {
+  if (!client.isOpen) await client.connect();
+  const cached = await client.get(key);
+  if (cached !== null) return JSON.parse(cached);
+  const value = await compute();
+  await client.set(key, JSON.stringify(value), { EX: ttlSeconds });
+  return value;
+}
+
+module.exports = { client, getOrSet };
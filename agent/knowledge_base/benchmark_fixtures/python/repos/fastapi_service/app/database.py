@@ -0,0 +1,28 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
+
+from app.config import settings
+
+engine = create_async_engine(settings.database_url, pool_size=10, max_overflow=20, pool_pre_ping=True)
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+class Base(DeclarativeBase):
+    """Declarative base shared by every ORM model in the service."""
+    pass
+
+
+async def get_db():
+    """Yield an async SQLAlchemy session per request and always close it afterwards."""
+    async with SessionLocal() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def init_models() -> None:
+    """Create all tables on startup; migrations take over in production."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
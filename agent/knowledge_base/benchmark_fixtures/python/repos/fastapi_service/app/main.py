@@ -0,0 +1,38 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+from app.database import init_models
+from app.routers import items
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run startup work (table creation) before serving and clean up on shutdown."""
+    await init_models()
+    yield
+
+
+app = FastAPI(title="Items service", lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:3000"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.include_router(items.router)
+
+
+@app.exception_handler(ValueError)
+async def value_error_handler(request: Request, exc: ValueError) -> JSONResponse:
+    """Turn domain validation errors into 422 responses with a JSON body."""
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+@app.get("/health")
+async def health_check() -> dict:
+    """Liveness probe used by the container orchestrator."""
+    return {"status": "ok"}
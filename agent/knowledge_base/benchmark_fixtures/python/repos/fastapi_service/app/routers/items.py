@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models import Item
+from app.security import get_current_user
+
+router = APIRouter(prefix="/items", tags=["items"])
+
+
+class ItemCreate(BaseModel):
+    title: str = Field(min_length=1, max_length=200)
+    description: str = ""
+
+
+class ItemRead(ItemCreate):
+    id: int
+
+    model_config = {"from_attributes": True}
+
+
+@router.get("/", response_model=list[ItemRead])
+async def list_items(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Paginated list of the current user's items using offset and limit."""
+    result = await db.execute(select(Item).where(Item.owner_id == user.id).offset(skip).limit(limit))
+    return result.scalars().all()
+
+
+@router.post("/", response_model=ItemRead, status_code=status.HTTP_201_CREATED)
+async def create_item(payload: ItemCreate, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    """Create an item owned by the authenticated user."""
+    item = Item(**payload.model_dump(), owner_id=user.id)
+    db.add(item)
+    await db.commit()
+    await db.refresh(item)
+    return item
+
+
+@router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_item(item_id: int, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    """Delete one item, returning 404 when it does not exist or belongs to someone else."""
+    item = await db.get(Item, item_id)
+    if item is None or item.owner_id != user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    await db.delete(item)
+    await db.commit()
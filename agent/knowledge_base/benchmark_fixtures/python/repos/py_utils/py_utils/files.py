@@ -0,0 +1,26 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+
+def atomic_write(path: Path, data: str, encoding: str = "utf-8") -> None:
+    """Write to a temporary file in the same directory and rename it over `path`."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read_in_chunks(path: Path, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Stream a large file in fixed-size chunks instead of loading it into memory."""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
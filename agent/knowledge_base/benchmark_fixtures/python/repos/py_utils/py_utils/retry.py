@@ -0,0 +1,37 @@
+import asyncio
+import functools
+import random
+import time
+
+
+def retry(times: int = 3, base_delay: float = 0.5, max_delay: float = 10.0, exceptions=(Exception,)):
+    """Retry a function with exponential backoff and jitter when it raises one of `exceptions`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(times):
+                try:
+                    return func(*args, **kwargs)
+                except exceptions:
+                    if attempt == times - 1:
+                        raise
+                    delay = min(max_delay, base_delay * 2 ** attempt)
+                    time.sleep(delay + random.uniform(0, delay / 2))
+        return wrapper
+    return decorator
+
+
+def async_retry(times: int = 3, base_delay: float = 0.5, exceptions=(Exception,)):
+    """Async variant of retry that awaits asyncio.sleep between attempts."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(times):
+                try:
+                    return await func(*args, **kwargs)
+                except exceptions:
+                    if attempt == times - 1:
+                        raise
+                    await asyncio.sleep(base_delay * 2 ** attempt)
+        return wrapper
+    return decorator
@@ -0,0 +1,35 @@
+import { useState } from "react";
+import { useAuth } from "../context/AuthContext";
+
+export default function LoginForm({ onSuccess }) {
+  const { login } = useAuth();
+  const [email, setEmail] = useState("");
+  const [password, setPassword] = useState("");
+  const [error, setError] = useState(null);
+  const [submitting, setSubmitting] = useState(false);
+
+  async function handleSubmit(event) {
+    event.preventDefault();
+    setSubmitting(true);
+    setError(null);
+    try {
+      await login(email, password);
+      onSuccess?.();
+    } catch (err) {
+      setError(err.message || "Invalid email or password");
+    } finally {
+      setSubmitting(false);
+    }
+  }
+
+  return (
+    <form onSubmit={handleSubmit} className="login-form">
+      <label htmlFor="email">Email</label>
+      <input id="email" type="email" value={email} onChange={(e) => setEmail(e.target.value)} required />
+      <label htmlFor="password">Password</label>
+      <input id="password" type="password" value={password} onChange={(e) => setPassword(e.target.value)} required />
+      {error && <p role="alert" className="error">{error}</p>}
+      <button type="submit" disabled={submitting}>{submitting ? "Signing in..." : "Sign in"}</button>
+    </form>
+  );
+}
@@ -0,0 +1,30 @@
+import { useReducer } from "react";
+
+function todosReducer(state, action) {
+  switch (action.type) {
+    case "add":
+      return [...state, { id: Date.now(), text: action.text, done: false }];
+    case "toggle":
+      return state.map((todo) => (todo.id === action.id ? { ...todo, done: !todo.done } : todo));
+    case "remove":
+      return state.filter((todo) => todo.id !== action.id);
+    default:
+      throw new Error(`Unknown action ${action.type}`);
+  }
+}
+
+export default function TodoList() {
+  const [todos, dispatch] = useReducer(todosReducer, []);
+
+  return (
+    <ul className="todo-list">
+      {todos.map((todo) => (
+        <li key={todo.id} className={todo.done ? "done" : undefined}>
+          <input type="checkbox" checked={todo.done} onChange={() => dispatch({ type: "toggle", id: todo.id })} />
+          {todo.text}
+          <button onClick={() => dispatch({ type: "remove", id: todo.id })}>Remove</button>
+        </li>
+      ))}
+    </ul>
+  );
+}
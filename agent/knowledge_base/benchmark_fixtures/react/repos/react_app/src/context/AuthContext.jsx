@@ -0,0 +1,37 @@
+import { createContext, useCallback, useContext, useMemo, useState } from "react";
+
+const AuthContext = createContext(null);
+
+// Holds the signed-in user and token and exposes login/logout to the component tree
+export function AuthProvider({ children }) {
+  const [user, setUser] = useState(null);
+  const [token, setToken] = useState(() => localStorage.getItem("token"));
+
+  const login = useCallback(async (email, password) => {
+    const response = await fetch("/api/auth/login", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ email, password }),
+    });
+    if (!response.ok) throw new Error("Invalid email or password");
+    const body = await response.json();
+    localStorage.setItem("token", body.token);
+    setToken(body.token);
+    setUser(body.user);
+  }, []);
+
+  const logout = useCallback(() => {
+    localStorage.removeItem("token");
+    setToken(null);
+    setUser(null);
+  }, []);
+
+  const value = useMemo(() => ({ user, token, login, logout }), [user, token, login, logout]);
+  return <AuthContext.Provider value={value}>{children}</AuthContext.Provider>;
+}
+
+export function useAuth() {
+  const context = useContext(AuthContext);
+  if (!context) throw new Error("useAuth must be used inside an AuthProvider");
+  return context;
+}
@@ -0,0 +1,13 @@
+import { useEffect, useState } from "react";
+
+// Delay updating a value until it has stopped changing for `delay` milliseconds
+export function useDebounce(value, delay = 300) {
+  const [debounced, setDebounced] = useState(value);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebounced(value), delay);
+    return () => clearTimeout(timer);
+  }, [value, delay]);
+
+  return debounced;
+}
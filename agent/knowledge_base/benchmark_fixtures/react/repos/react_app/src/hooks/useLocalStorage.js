@@ -0,0 +1,21 @@
+import { useState } from "react";
+
+// useState that persists its value to window.localStorage under `key`
+export function useLocalStorage(key, initialValue) {
+  const [stored, setStored] = useState(() => {
+    try {
+      const item = window.localStorage.getItem(key);
+      return item ? JSON.parse(item) : initialValue;
+    } catch {
+      return initialValue;
+    }
+  });
+
+  const setValue = (value) => {
+    const next = value instanceof Function ? value(stored) : value;
+    setStored(next);
+    window.localStorage.setItem(key, JSON.stringify(next));
+  };
+
+  return [stored, setValue];
+}
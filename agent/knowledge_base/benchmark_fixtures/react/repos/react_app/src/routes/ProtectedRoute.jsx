@@ -0,0 +1,13 @@
+import { Navigate, Outlet, useLocation } from "react-router-dom";
+import { useAuth } from "../context/AuthContext";
+
+// Redirect anonymous visitors to /login, remembering where they were going
+export default function ProtectedRoute({ redirectTo = "/login" }) {
+  const { token } = useAuth();
+  const location = useLocation();
+
+  if (!token) {
+    return <Navigate to={redirectTo} replace state={{ from: location }} />;
+  }
+  return <Outlet />;
+}
@@ -0,0 +1,21 @@
+import { ButtonHTMLAttributes, forwardRef } from "react";
+
+type Variant = "primary" | "secondary" | "danger";
+
+interface ButtonProps extends ButtonHTMLAttributes<HTMLButtonElement> {
+  variant?: Variant;
+  loading?: boolean;
+}
+
+// Styled button with variants and a loading state; forwards its ref to the DOM node
+export const Button = forwardRef<HTMLButtonElement, ButtonProps>(function Button(
+  { variant = "primary", loading = false, disabled, children, ...props },
+  ref
+) {
+  return (
+    <button ref={ref} className={`btn btn-${variant}`} disabled={disabled || loading} aria-busy={loading} {...props}>
+      {loading ? <span className="spinner" aria-hidden="true" /> : null}
+      {children}
+    </button>
+  );
+});
@@ -0,0 +1,50 @@
+import { useMemo, useState } from "react";
+
+export interface Column<T> {
+  key: keyof T;
+  header: string;
+  sortable?: boolean;
+}
+
+interface DataTableProps<T> {
+  rows: T[];
+  columns: Column<T>[];
+  pageSize?: number;
+}
+
+// Generic table with client-side sorting by column and pagination
+export function DataTable<T extends { id: string | number }>({ rows, columns, pageSize = 10 }: DataTableProps<T>) {
+  const [sortKey, setSortKey] = useState<keyof T | null>(null);
+  const [ascending, setAscending] = useState(true);
+  const [page, setPage] = useState(0);
+
+  const sorted = useMemo(() => {
+    if (sortKey === null) return rows;
+    return [...rows].sort((a, b) => (a[sortKey] < b[sortKey] ? -1 : a[sortKey] > b[sortKey] ? 1 : 0) * (ascending ? 1 : -1));
+  }, [rows, sortKey, ascending]);
+
+  const visible = sorted.slice(page * pageSize, (page + 1) * pageSize);
+  const pages = Math.ceil(rows.length / pageSize);
+
+  return (
+    <table>
+      <thead>
+        <tr>
+          {columns.map((column) => (
+            <th key={String(column.key)} onClick={() => column.sortable && (setAscending(sortKey === column.key ? !ascending : true), setSortKey(column.key))}>
+              {column.header}
+            </th>
+          ))}
+        </tr>
+      </thead>
+      <tbody>
+        {visible.map((row) => (
+          <tr key={row.id}>{columns.map((column) => <td key={String(column.key)}>{String(row[column.key])}</td>)}</tr>
+        ))}
+      </tbody>
+      <tfoot>
+        <tr><td colSpan={columns.length}>Page {page + 1} of {pages} <button onClick={() => setPage(Math.max(0, page - 1))}>Prev</button> <button onClick={() => setPage(Math.min(pages - 1, page + 1))}>Next</button></td></tr>
+      </tfoot>
+    </table>
+  );
+}
@@ -0,0 +1,201 @@
+"""
+Duplicate and near-duplicate chunk detection for KB ingestion.
+
+Curated repos vendor many of the same patterns, so each group of equivalent
+chunks is stored once: the first chunk seen becomes the group's representative
+(the only one upserted into Chroma) and the others are recorded as its sources.
+Exact duplicates are matched by normalized-content hash, near duplicates by
+MinHash signatures bucketed with LSH and confirmed by estimated Jaccard
+similarity. Group membership is persisted so incremental rebuilds can remove a
+chunk without dropping a representative that other files still share.
+"""
+
+import gzip
+import hashlib
+import json
+import re
+import zlib
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from agent.knowledge_base.embeddings import normalize_content
+
+DEDUP_FILENAME = "dedup.json.gz"
+DEDUP_VERSION = 2
+NEAR_DUPLICATE_THRESHOLD = 0.85
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 5
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+
+def minhash_signature(text: str) -> bytes:
+    """MinHash of the text's token shingles, packed as NUM_PERMUTATIONS little-endian uint32s."""
+    tokens = _TOKEN_PATTERN.findall(text)
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in set(shingles)), dtype=np.uint64)
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=1).astype("<u4").tobytes()
+
+
+def _similarity(a: bytes, b: bytes) -> float:
+    return float(np.count_nonzero(np.frombuffer(a, dtype="<u4") == np.frombuffer(b, dtype="<u4"))) / NUM_PERMUTATIONS
+
+
+class ChunkDeduplicator:
+    def __init__(self, path: Path, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        # chunk id -> {"rep", "repo", "file_path", "chunk_type", "category"}
+        self.chunks: dict[str, dict] = {}
+        # representative id -> {"exact", "signature", "members"}; signatures are packed bytes in memory, hex on disk
+        self.groups: dict[str, dict] = {}
+        self._exact: dict[str, str] = {}
+        self._buckets: dict[bytes, list[str]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "ChunkDeduplicator":
+        dedup = cls(path)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return dedup
+        if data.get("version") not in (1, DEDUP_VERSION):
+            return dedup
+        dedup.chunks = data["chunks"]
+        for rep_id, group in data["groups"].items():
+            signature = group["signature"]
+            if isinstance(signature, list):
+                # Version 1 stored signatures as lists of ints
+                group["signature"] = np.asarray(signature, dtype="<u4").tobytes()
+            else:
+                group["signature"] = bytes.fromhex(signature)
+            dedup._add_group(rep_id, group)
+        return dedup
+
+    def save(self) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(
+                {"version": DEDUP_VERSION, "chunks": self.chunks, "groups": self.groups},
+                f,
+                separators=(",", ":"),
+                default=bytes.hex
+            )
+        tmp_path.replace(self.path)
+
+    def add(self, chunk) -> Optional[str]:
+        """Register a chunk; returns the representative id if it duplicates a stored chunk, else None."""
+        info = {
+            "repo": chunk.repo_url,
+            "file_path": chunk.file_path,
+            "chunk_type": chunk.chunk_type,
+            "category": chunk.category
+        }
+        exact = hashlib.sha256(normalize_content(chunk.code).encode("utf-8")).hexdigest()
+
+        rep_id = self._exact.get(exact)
+        signature = None
+        if rep_id is None:
+            signature = minhash_signature(chunk.code)
+            rep_id = self._near_duplicate(signature)
+
+        if rep_id is not None:
+            self.chunks[chunk.id] = {**info, "rep": rep_id}
+            self.groups[rep_id]["members"].append(chunk.id)
+            return rep_id
+
+        self.chunks[chunk.id] = {**info, "rep": chunk.id}
+        self._add_group(chunk.id, {"exact": exact, "signature": signature, "members": [chunk.id]})
+        return None
+
+    def remove(self, chunk_id: str) -> tuple[str, Optional[str]]:
+        """Forget a chunk and say what must happen to the stored copy.
+
+        ("delete", None): nothing else shares it; ("promote", new_rep): the stored chunk
+        must move to `new_rep`; ("detach", rep): only `rep`'s sources changed;
+        ("unknown", None): the chunk predates dedup and is simply deleted.
+        """
+        info = self.chunks.pop(chunk_id, None)
+        if info is None:
+            return "unknown", None
+
+        rep_id = info["rep"]
+        group = self.groups[rep_id]
+        group["members"].remove(chunk_id)
+        if rep_id != chunk_id:
+            return "detach", rep_id
+
+        self._drop_group(rep_id)
+        if not group["members"]:
+            return "delete", None
+
+        new_rep = group["members"][0]
+        for member in group["members"]:
+            self.chunks[member]["rep"] = new_rep
+        self._add_group(new_rep, group)
+        return "promote", new_rep
+
+    def is_representative(self, chunk_id: str) -> bool:
+        return chunk_id in self.groups
+
+    def metadata(self, rep_id: str) -> dict:
+        info = self.chunks[rep_id]
+        sources = [
+            {"repo": self.chunks[m]["repo"], "file_path": self.chunks[m]["file_path"]}
+            for m in self.groups[rep_id]["members"]
+        ]
+        return {
+            "file_path": info["file_path"],
+            "chunk_type": info["chunk_type"],
+            "category": info["category"],
+            "repo": info["repo"],
+            "sources": json.dumps(sources)
+        }
+
+    def _near_duplicate(self, signature: bytes) -> Optional[str]:
+        best, best_score = None, self.threshold
+        checked = set()
+        for key in self._band_keys(signature):
+            for candidate in self._buckets.get(key, []):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                score = _similarity(signature, self.groups[candidate]["signature"])
+                if score >= best_score:
+                    best, best_score = candidate, score
+        return best
+
+    def _band_keys(self, signature: bytes) -> list[bytes]:
+        width = len(signature) // LSH_BANDS
+        return [bytes((band,)) + signature[band * width:(band + 1) * width] for band in range(LSH_BANDS)]
+
+    def _add_group(self, rep_id: str, group: dict) -> None:
+        self.groups[rep_id] = group
+        self._exact[group["exact"]] = rep_id
+        for key in self._band_keys(group["signature"]):
+            self._buckets.setdefault(key, []).append(rep_id)
+
+    def _drop_group(self, rep_id: str) -> None:
+        group = self.groups.pop(rep_id)
+        if self._exact.get(group["exact"]) == rep_id:
+            del self._exact[group["exact"]]
+        for key in self._band_keys(group["signature"]):
+            bucket = self._buckets.get(key)
+            if bucket and rep_id in bucket:
+                bucket.remove(rep_id)
+                if not bucket:
+                    del self._buckets[key]
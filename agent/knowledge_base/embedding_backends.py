@@ -0,0 +1,199 @@
+"""
+Local embedding backends for knowledge-base ingestion and queries.
+
+A tech stack picks its backend in the registry, e.g.
+
+    "embedding": {"backend": "onnx-minilm", "batch_size": 64, "threads": 4}
+
+Every backend runs on CPU without network access once its model files are
+on disk. The builder records the backend config in the collection metadata
+so queries always embed with the model the collection was built with.
+"""
+
+import json
+import os
+import zlib
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from agent.knowledge_base.lexical_index import tokenize
+
+DEFAULT_EMBEDDING_CONFIG = {
+    "backend": os.getenv("KB_EMBEDDING_BACKEND", "onnx-minilm"),
+    "batch_size": int(os.getenv("KB_EMBED_BATCH_SIZE", "64")),
+    "threads": int(os.getenv("KB_EMBEDDING_THREADS", "0"))
+}
+
+# Model id of collections built before backends were recorded (Chroma's default all-MiniLM-L6-v2)
+LEGACY_MODEL_ID = "default:{}"
+
+
+class OnnxMiniLMBackend:
+    """all-MiniLM-L6-v2 on onnxruntime, the model behind Chroma's default embedding function.
+
+    Unlike Chroma's wrapper it pins the session's thread count and pads each batch
+    to its longest document instead of always to 256 tokens. Vectors are the same,
+    so the model id matches collections built with Chroma's default.
+    """
+
+    MAX_TOKENS = 256
+
+    def __init__(self, batch_size: int = 64, threads: int = 0, providers: Optional[list[str]] = None):
+        from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+        self.batch_size = batch_size
+        self.threads = threads
+        self._onnx = ONNXMiniLM_L6_V2(preferred_providers=providers)
+        self._providers = providers
+        self._session = None
+        self._tokenizer = None
+
+    @staticmethod
+    def name() -> str:
+        return "default"
+
+    def get_config(self) -> dict:
+        return {}
+
+    def _load(self) -> None:
+        if self._session is not None:
+            return
+        self._onnx._download_model_if_not_exists()
+        model_dir = os.path.join(self._onnx.DOWNLOAD_PATH, self._onnx.EXTRACTED_FOLDER_NAME)
+        ort = self._onnx.ort
+
+        options = ort.SessionOptions()
+        options.log_severity_level = 3
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads > 0:
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+
+        tokenizer = self._onnx.Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        tokenizer.enable_truncation(max_length=self.MAX_TOKENS)
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        self._tokenizer = tokenizer
+        self._session = ort.InferenceSession(
+            os.path.join(model_dir, "model.onnx"),
+            providers=self._providers or ort.get_available_providers(),
+            sess_options=options
+        )
+
+    def __call__(self, input: list[str]) -> list:
+        if not input:
+            return []
+        self._load()
+        vectors = []
+        for start in range(0, len(input), max(1, self.batch_size)):
+            encoded = self._tokenizer.encode_batch(input[start:start + self.batch_size])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+            hidden = self._session.run(None, {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": np.zeros_like(input_ids)
+            })[0]
+            mask = attention_mask[..., np.newaxis].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            vectors.extend(_normalize(pooled))
+        return vectors
+
+
+class SentenceTransformerBackend:
+    """Any sentence-transformers model from a local path or the local Hugging Face cache."""
+
+    def __init__(self, model: str = "all-MiniLM-L6-v2", batch_size: int = 64, threads: int = 0):
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("sentence-transformers required. Run: pip install sentence-transformers")
+
+        if threads > 0:
+            torch.set_num_threads(threads)
+        self.model = model
+        self.batch_size = batch_size
+        self.threads = threads
+        self._model = SentenceTransformer(model, device="cpu", local_files_only=True)
+
+    @staticmethod
+    def name() -> str:
+        return "sentence_transformer"
+
+    def get_config(self) -> dict:
+        return {"model": self.model}
+
+    def __call__(self, input: list[str]) -> list:
+        if not input:
+            return []
+        embeddings = self._model.encode(
+            list(input),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return list(embeddings.astype(np.float32))
+
+
+class HashingBackend:
+    """Signed feature hashing of code tokens; no model files and an order of magnitude faster than MiniLM."""
+
+    def __init__(self, dim: int = 384, batch_size: int = 256, threads: int = 0):
+        self.dim = dim
+        self.batch_size = batch_size
+        self.threads = threads
+
+    @staticmethod
+    def name() -> str:
+        return "hashing"
+
+    def get_config(self) -> dict:
+        return {"dim": self.dim}
+
+    def __call__(self, input: list[str]) -> list:
+        vectors = np.zeros((len(input), self.dim), dtype=np.float32)
+        for row, text in enumerate(input):
+            for token in tokenize(text):
+                h = zlib.crc32(token.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return list(_normalize(np.sign(vectors) * np.log1p(np.abs(vectors))))
+
+
+EMBEDDING_BACKENDS = {
+    "onnx-minilm": OnnxMiniLMBackend,
+    "sentence-transformers": SentenceTransformerBackend,
+    "hashing": HashingBackend
+}
+
+
+def resolve_embedding_config(config: Optional[dict] = None) -> dict:
+    return {**DEFAULT_EMBEDDING_CONFIG, **(config or {})}
+
+
+def create_embedding_backend(config: Optional[dict] = None):
+    options = resolve_embedding_config(config)
+    backend = options.pop("backend")
+    backend_cls = EMBEDDING_BACKENDS.get(backend)
+    if backend_cls is None:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    return backend_cls(**options)
+
+
+def config_from_metadata(metadata: Optional[dict]) -> Optional[dict]:
+    raw = (metadata or {}).get("embedding_config")
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1e-12
+    return (vectors / norms).astype(np.float32)
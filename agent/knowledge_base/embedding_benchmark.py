@@ -0,0 +1,122 @@
+"""
+Embedding throughput benchmark over chunks already stored in a tech's KB.
+
+    python -m agent.knowledge_base.embedding_benchmark react --backends onnx-minilm hashing --threads 4
+
+For each backend it reports ingestion throughput (docs/sec) and query latency
+(embedding one query plus a brute-force top-k over the sampled vectors).
+The embedding cache is bypassed so every run measures the model itself.
+"""
+
+import json
+import random
+import statistics
+import time
+from typing import Optional
+
+import numpy as np
+
+from agent.knowledge_base.embedding_backends import create_embedding_backend
+from agent.knowledge_base.kb_manager import get_kb_manager
+
+
+def sample_documents(tech_stack: str, sample: int, base_path: str = ".appbuilder") -> list[str]:
+    collection = get_kb_manager(base_path)._get_collection(tech_stack)
+    total = collection.count()
+    offset = random.randint(0, max(0, total - sample))
+    page = collection.get(limit=sample, offset=offset, include=["documents"])
+    return [doc for doc in page["documents"] if doc]
+
+
+def make_queries(documents: list[str], count: int) -> list[str]:
+    queries = []
+    for doc in random.sample(documents, min(count, len(documents))):
+        line = next((l.strip() for l in doc.splitlines() if len(l.strip()) > 10), doc.strip())
+        queries.append(line[:80])
+    return queries
+
+
+def benchmark_backend(config: dict, documents: list[str], queries: list[str], top_k: int = 5) -> dict:
+    backend = create_embedding_backend(config)
+    backend(documents[:min(8, len(documents))])
+
+    started = time.perf_counter()
+    vectors = np.asarray(backend(documents), dtype=np.float32)
+    embed_seconds = time.perf_counter() - started
+
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        query_vector = np.asarray(backend([query])[0], dtype=np.float32)
+        scores = vectors @ query_vector
+        np.argpartition(-scores, min(top_k, len(scores) - 1))[:top_k]
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        **config,
+        "docs": len(documents),
+        "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        "docs_per_second": round(len(documents) / embed_seconds, 1) if embed_seconds > 0 else None,
+        "query_p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "query_p95_ms": round(_percentile(latencies, 95), 2) if latencies else None
+    }
+
+
+def run_benchmark(
+    tech_stack: str,
+    backends: list[str],
+    sample: int = 500,
+    queries: int = 50,
+    batch_size: Optional[int] = None,
+    threads: Optional[int] = None,
+    base_path: str = ".appbuilder"
+) -> list[dict]:
+    documents = sample_documents(tech_stack, sample, base_path)
+    if not documents:
+        raise ValueError(f"No stored chunks for {tech_stack}; build its KB first")
+    query_texts = make_queries(documents, queries)
+
+    results = []
+    for backend in backends:
+        config = {"backend": backend}
+        if batch_size:
+            config["batch_size"] = batch_size
+        if threads is not None:
+            config["threads"] = threads
+        try:
+            results.append(benchmark_backend(config, documents, query_texts))
+        except Exception as e:
+            results.append({**config, "error": str(e)})
+    return results
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m agent.knowledge_base.embedding_benchmark",
+        description="Compare embedding backends on a sample of a tech's stored chunks"
+    )
+    parser.add_argument("tech_stack")
+    parser.add_argument("--backends", nargs="+", default=["onnx-minilm", "hashing"])
+    parser.add_argument("--sample", type=int, default=500, help="Stored chunks to embed")
+    parser.add_argument("--queries", type=int, default=50, help="Queries for latency percentiles")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.tech_stack,
+        args.backends,
+        sample=args.sample,
+        queries=args.queries,
+        batch_size=args.batch_size,
+        threads=args.threads
+    )
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,191 @@
+"""
+Persistent embedding cache for knowledge-base chunks and queries.
+
+Vectors are stored in SQLite under .appbuilder/cache, keyed by a hash of the
+embedding model id and the whitespace-normalized text, so unchanged chunks and
+snippets vendored in several repos are embedded once.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Optional
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".appbuilder/cache/embeddings.sqlite3")
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# SQLite's default limit on host parameters per statement is 999 on older builds
+_LOOKUP_CHUNK = 500
+# Access times of cache hits are buffered in memory and written with the next put_many
+_MAX_PENDING_ACCESSES = 10000
+
+
+def normalize_content(text: str) -> str:
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").strip().split("\n")
+    return "\n".join(line.rstrip() for line in lines)
+
+
+def content_key(model_id: str, text: str) -> str:
+    return hashlib.sha256(f"{model_id}\0{normalize_content(text)}".encode("utf-8")).hexdigest()
+
+
+def model_id_for(embedding_function) -> str:
+    try:
+        name = embedding_function.name()
+    except Exception:
+        name = type(embedding_function).__name__
+    try:
+        config = embedding_function.get_config()
+    except Exception:
+        config = {}
+    return f"{name}:{json.dumps(config, sort_keys=True, default=str)}"
+
+
+class EmbeddingCache:
+    def __init__(self, path: str | Path = EMBEDDING_CACHE_PATH, max_bytes: int = EMBEDDING_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._accessed: dict[str, float] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_access ON embeddings(last_access)")
+        self._conn.commit()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """Read-only: hits only update last_access in memory, so lookups never take the write lock."""
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+            now = time.time()
+            for key in found:
+                if key in self._accessed or len(self._accessed) < _MAX_PENDING_ACCESSES:
+                    self._accessed[key] = now
+        return found
+
+    def put_many(self, items: dict[str, list[float]]) -> None:
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            blob = array("f", [float(x) for x in vector]).tobytes()
+            rows.append((key, blob, len(blob), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._write_accesses()
+            self._evict()
+            self._conn.commit()
+
+    def flush_accesses(self) -> None:
+        """Write buffered access times, e.g. at the end of an ingestion run."""
+        with self._lock:
+            if self._accessed:
+                self._write_accesses()
+                self._conn.commit()
+
+    def _write_accesses(self) -> None:
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                [(at, key) for key, at in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM embeddings ORDER BY last_access").fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= target:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._accessed.clear()
+
+
+class CachedEmbeddingFunction:
+    """Wraps a Chroma embedding function and only embeds texts missing from the cache."""
+
+    def __init__(self, embedding_function, cache: Optional[EmbeddingCache] = None, model_id: Optional[str] = None):
+        self.embedding_function = embedding_function
+        self.cache = cache
+        self.model_id = model_id or model_id_for(embedding_function)
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, input: list[str]) -> list[list[float]]:
+        if not input:
+            return []
+        if self.cache is None:
+            return [list(map(float, v)) for v in self.embedding_function(input)]
+
+        keys = [content_key(self.model_id, text) for text in input]
+        vectors = self.cache.get_many(list(dict.fromkeys(keys)))
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, input):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        self.hits += len(input) - sum(1 for key in keys if key in missing)
+        self.misses += len(missing)
+
+        if missing:
+            embedded = self.embedding_function(list(missing.values()))
+            fresh = {key: list(map(float, vector)) for key, vector in zip(missing, embedded)}
+            self.cache.put_many(fresh)
+            vectors.update(fresh)
+
+        return [vectors[key] for key in keys]
+
+    def flush_accesses(self) -> None:
+        if self.cache is not None:
+            self.cache.flush_accesses()
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    global _cache
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+        return _cache
+
+
+def cached_embedding_function(embedding_function) -> CachedEmbeddingFunction:
+    return CachedEmbeddingFunction(embedding_function, get_embedding_cache())
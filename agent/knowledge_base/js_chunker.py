@@ -0,0 +1,230 @@
+"""
+Single-pass chunker for JavaScript, TypeScript, JSX/TSX and Vue SFC scripts.
+
+The scanner walks the source once, skipping strings, template literals,
+comments and regex literals, and tracks bracket depth. Every line that starts
+at column 0 while depth is 0 begins a new top-level statement; declarations
+among those statements become chunks, with leading comments attached.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable
+
+_WHITESPACE = " \t\r\n"
+_IDENTIFIER_CHARS = "_$"
+
+# After these, a "/" starts a regex literal rather than a division
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%~^")
+_REGEX_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else", "yield", "await"}
+
+# Column-0 lines that can only be top-level; used to recover if depth drifts (e.g. an apostrophe in JSX text)
+_RESYNC = re.compile(r"(?:export|import|function|class|interface|enum|declare)\b")
+
+_DECLARATION = re.compile(
+    r"(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?"
+    r"(function\s*\*?|class|const|let|var|interface|type|enum)\s+([A-Za-z_$][\w$]*)"
+)
+_EXPORT_DEFAULT = re.compile(r"export\s+default\b")
+_MODULE_EXPORTS = re.compile(r"module\.exports\s*=")
+_VUE_SCRIPT = re.compile(r"<script\b[^>]*>(.*?)</script\s*>", re.DOTALL | re.IGNORECASE)
+
+
+@dataclass
+class JsDeclaration:
+    name: str
+    kind: str
+    code: str
+
+
+def chunk_js(source: str) -> list[JsDeclaration]:
+    """Top-level declarations of a JS/TS/JSX/TSX module, in source order."""
+    declarations = []
+    pending_comment = None
+
+    for start, end in _segments(source, _top_level_starts(source)):
+        text = source[start:end].rstrip()
+        if not text:
+            continue
+        if _is_comment_only(text):
+            if pending_comment is None:
+                pending_comment = start
+            continue
+
+        declaration = _classify(text)
+        if declaration is not None:
+            name, kind = declaration
+            code_start = pending_comment if pending_comment is not None else start
+            declarations.append(JsDeclaration(name, kind, source[code_start:end].rstrip()))
+        pending_comment = None
+
+    return declarations
+
+
+def chunk_vue(source: str) -> list[JsDeclaration]:
+    """Top-level declarations from every <script> block of a Vue single-file component."""
+    declarations = []
+    for match in _VUE_SCRIPT.finditer(source):
+        for declaration in chunk_js(match.group(1).strip("\n")):
+            if declaration.name == "default":
+                declaration.kind = "component"
+            declarations.append(declaration)
+    return declarations
+
+
+def _segments(source: str, starts: list[int]) -> Iterable[tuple[int, int]]:
+    for i, start in enumerate(starts):
+        yield start, starts[i + 1] if i + 1 < len(starts) else len(source)
+
+
+def _top_level_starts(source: str) -> list[int]:
+    n = len(source)
+    i = 0
+    depth = 0
+    templates: list[int] = []
+    prev = ""
+    starts = []
+    at_line_start = True
+
+    while i < n:
+        ch = source[i]
+
+        if at_line_start:
+            at_line_start = False
+            if ch not in _WHITESPACE and ch not in "})]":
+                if depth == 0 or (not templates and _RESYNC.match(source, i)):
+                    depth = 0
+                    starts.append(i)
+
+        if ch == "\n":
+            at_line_start = True
+            i += 1
+            continue
+        if ch in _WHITESPACE:
+            i += 1
+            continue
+
+        if ch == "/" and i + 1 < n:
+            nxt = source[i + 1]
+            if nxt == "/":
+                end = source.find("\n", i)
+                i = n if end < 0 else end
+                continue
+            if nxt == "*":
+                end = source.find("*/", i + 2)
+                i = n if end < 0 else end + 2
+                continue
+            if prev == "" or prev in _REGEX_PRECEDERS:
+                i = _skip_regex(source, i + 1)
+                prev = "a"
+                continue
+
+        if ch == "'" or ch == '"':
+            i = _skip_string(source, i + 1, ch)
+            prev = "a"
+            continue
+
+        if ch == "`" or (ch == "}" and templates and depth - 1 == templates[-1]):
+            if ch == "}":
+                templates.pop()
+                depth -= 1
+            i, opened = _skip_template(source, i + 1)
+            if opened:
+                templates.append(depth)
+                depth += 1
+                prev = "{"
+            else:
+                prev = "a"
+            continue
+
+        if ch.isalnum() or ch in _IDENTIFIER_CHARS:
+            j = i + 1
+            while j < n and (source[j].isalnum() or source[j] in _IDENTIFIER_CHARS):
+                j += 1
+            prev = "(" if source[i:j] in _REGEX_KEYWORDS else "a"
+            i = j
+            continue
+
+        if ch in "{([":
+            depth += 1
+        elif ch in "})]":
+            depth = max(0, depth - 1)
+        prev = ch
+        i += 1
+
+    return starts
+
+
+def _skip_string(source: str, i: int, quote: str) -> int:
+    # Quoted strings cannot span lines, so stopping at a newline bounds the damage of a stray quote in JSX text
+    n = len(source)
+    while i < n:
+        ch = source[i]
+        if ch == "\\":
+            i += 2
+        elif ch == quote:
+            return i + 1
+        elif ch == "\n":
+            return i
+        else:
+            i += 1
+    return n
+
+
+def _skip_template(source: str, i: int) -> tuple[int, bool]:
+    """Advance past template text; returns (position, True) when stopping at a `${` expression."""
+    n = len(source)
+    while i < n:
+        ch = source[i]
+        if ch == "\\":
+            i += 2
+        elif ch == "`":
+            return i + 1, False
+        elif ch == "$" and i + 1 < n and source[i + 1] == "{":
+            return i + 2, True
+        else:
+            i += 1
+    return n, False
+
+
+def _skip_regex(source: str, i: int) -> int:
+    n = len(source)
+    in_class = False
+    while i < n:
+        ch = source[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "\n":
+            return i
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "/":
+            return i + 1
+        i += 1
+    return n
+
+
+def _is_comment_only(text: str) -> bool:
+    return all(
+        line.lstrip().startswith(("//", "/*", "*"))
+        for line in text.splitlines() if line.strip()
+    )
+
+
+def _classify(text: str) -> tuple[str, str] | None:
+    match = _DECLARATION.match(text)
+    if match:
+        keyword, name = match.group(1), match.group(2)
+        if keyword == "class":
+            return name, "class"
+        if keyword in ("interface", "type", "enum"):
+            return name, "type"
+        return name, "component" if name[0].isupper() else "function"
+    if _EXPORT_DEFAULT.match(text):
+        return "default", "function"
+    if _MODULE_EXPORTS.match(text):
+        return "module.exports", "function"
+    return None
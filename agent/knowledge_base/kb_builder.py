@@ -1,9 +1,14 @@
 import subprocess
 import hashlib
 import ast
-import re
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from dataclasses import dataclass
 
 try:
@@ -13,6 +18,26 @@ except ImportError:
     chromadb = None
 
 from agent.knowledge_base.curated_repos import get_high_priority_repos
+from agent.knowledge_base.embeddings import cached_embedding_function
+from agent.knowledge_base.embedding_backends import LEGACY_MODEL_ID, create_embedding_backend, resolve_embedding_config
+from agent.knowledge_base.kb_manager import VERSION_FILENAME, get_kb_manager
+from agent.knowledge_base.js_chunker import chunk_js, chunk_vue
+from agent.knowledge_base.lexical_index import BM25Index, INDEX_FILENAME
+from agent.knowledge_base.dedup import ChunkDeduplicator, DEDUP_FILENAME
+from agent.knowledge_base.snapshot import SNAPSHOT_DIRNAME, export_snapshot
+
+
+INGEST_WORKERS = int(os.getenv("KB_INGEST_WORKERS", str(min(8, os.cpu_count() or 1))))
+UPSERT_BATCH_SIZE = int(os.getenv("KB_UPSERT_BATCH_SIZE", "256"))
+PROGRESS_INTERVAL_SECONDS = 5.0
+MAX_PARENT_CHUNK_CHARS = int(os.getenv("KB_MAX_PARENT_CHUNK_CHARS", "6000"))
+MANIFEST_VERSION = 1
+# Files larger than this are skipped (bundles, lockfiles, datasets); none of them are useful patterns
+MAX_FILE_BYTES = int(os.getenv("KB_MAX_FILE_BYTES", str(1024 * 1024)))
+# Files submitted to the parser processes but not yet consumed; bounds in-flight chunks
+EXTRACT_QUEUE_SIZE = int(os.getenv("KB_EXTRACT_QUEUE_SIZE", "64"))
+# A NUL byte in the first block marks a file as binary, as git does
+BINARY_SNIFF_BYTES = 8192
 
 
 @dataclass
@@ -25,16 +50,47 @@ class CodeChunk:
     repo_url: str
 
 
+@dataclass
+class FileExtraction:
+    path: str
+    content_hash: str
+    chunks: Optional[list[CodeChunk]] = None
+    # "too_large" and "binary" files are dropped from the KB; "error" files keep their previous chunks
+    skipped: Optional[str] = None
+
+
 class TechStackKnowledgeBuilder:
     def __init__(self, base_path: str = ".appbuilder"):
         self.base_path = Path(base_path)
         self.kb_path = self.base_path / "knowledge_bases"
 
-    def build_tech_kb(self, tech_stack: str, max_repos: Optional[int] = None) -> dict:
+    def build_tech_kb(
+        self,
+        tech_stack: str,
+        max_repos: Optional[int] = None,
+        workers: int = INGEST_WORKERS,
+        batch_size: int = UPSERT_BATCH_SIZE,
+        embed_batch_size: Optional[int] = None,
+        update: bool = False,
+        full: bool = False,
+        embedding_config: Optional[dict] = None,
+        repos: Optional[list[dict]] = None
+    ) -> dict:
+        """Build or incrementally refresh the KB for `tech_stack`.
+
+        Files whose content hash matches the manifest are skipped; changed files are
+        re-chunked, and chunk ids of changed or removed files are deleted. `update`
+        fetches the latest commit of existing checkouts, `full` ignores the manifest.
+        The embedding backend comes from the tech's registry entry unless
+        `embedding_config` is given; switching backends rebuilds the collection.
+        `repos` replaces the curated list; a repo whose url is a local directory is
+        read in place instead of cloned.
+        """
         if chromadb is None:
             raise ImportError("chromadb required. Run: pip install chromadb")
 
-        repos = get_high_priority_repos(tech_stack)
+        if repos is None:
+            repos = get_high_priority_repos(tech_stack)
         if max_repos:
             repos = repos[:max_repos]
 
@@ -49,40 +105,259 @@ class TechStackKnowledgeBuilder:
             path=str(chroma_path),
             settings=Settings(anonymized_telemetry=False)
         )
-        collection = client.get_or_create_collection(
-            name=f"{tech_stack}_patterns",
-            metadata={"tech_stack": tech_stack}
-        )
+        if embedding_config is None:
+            tech_info = get_kb_manager(str(self.base_path)).get_tech_info(tech_stack) or {}
+            embedding_config = tech_info.get("embedding")
+        embedding_config = resolve_embedding_config(embedding_config)
+        backend = create_embedding_backend(embedding_config)
+        embedder = cached_embedding_function(backend)
+        embed_batch_size = embed_batch_size or backend.batch_size
+
+        collection_metadata = {
+            "tech_stack": tech_stack,
+            "embedding_model": embedder.model_id,
+            "embedding_config": json.dumps(embedding_config, sort_keys=True)
+        }
+        collection_name = f"{tech_stack}_patterns"
+        collection = client.get_or_create_collection(name=collection_name, metadata=collection_metadata)
+        
+        rebuilt = False
+        built_with = (collection.metadata or {}).get("embedding_model", LEGACY_MODEL_ID)
+        if built_with != embedder.model_id and collection.count():
+            # Vectors from another model are not comparable (and may differ in size), so start over
+            print(f"[{tech_stack}] embedding model changed from {built_with} to {embedder.model_id}, rebuilding")
+            client.delete_collection(collection_name)
+            collection = client.create_collection(name=collection_name, metadata=collection_metadata)
+            full = rebuilt = True
+        elif collection.metadata != collection_metadata:
+            collection.modify(metadata=collection_metadata)
+        batch_size = min(batch_size, client.get_max_batch_size())
 
-        total_chunks = 0
-        for repo_info in repos:
-            try:
-                repo_path = self._clone_repo(repo_info["url"], repos_path)
-                chunks = self._extract_chunks(repo_path, repo_info, tech_stack)
+        manifest = KBManifest.load(tech_kb_path / "manifest.json")
+        dedup_path = tech_kb_path / DEDUP_FILENAME
+        dedup = ChunkDeduplicator(dedup_path) if rebuilt else ChunkDeduplicator.load(dedup_path)
+
+        progress = IngestProgress(tech_stack)
+        stats = {
+            "files_changed": 0,
+            "files_unchanged": 0,
+            "files_removed": 0,
+            "files_skipped": 0,
+            "chunks_deleted": 0,
+            "duplicates_skipped": 0
+        }
+        
+        # Clones run on threads (git does the work); files stream through the parser processes repo by repo.
+        # Parsers are spawned, not forked: forking while clone and Chroma threads hold locks can deadlock them
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as clone_pool, \
+                ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn")) as pool:
+            clones = {
+                clone_pool.submit(self._clone_repo, repo_info["url"], repos_path, update): repo_info
+                for repo_info in repos
+            }
+            for future in as_completed(clones):
+                repo_info = clones[future]
+                try:
+                    repo_path = future.result()
+                except Exception as e:
+                    print(f"Error processing {repo_info['url']}: {e}")
+                    continue
                 
-                for chunk in chunks:
-                    collection.upsert(
-                        documents=[chunk.code],
-                        metadatas=[{
-                            "file_path": chunk.file_path,
-                            "chunk_type": chunk.chunk_type,
-                            "category": chunk.category,
-                            "repo": chunk.repo_url
-                        }],
-                        ids=[chunk.id]
+                try:
+                    self._ingest_repo(
+                        pool, collection, manifest, dedup, embedder, repo_path, repo_info, tech_stack,
+                        full, batch_size, embed_batch_size, progress, stats
                     )
-                    total_chunks += 1
-                    
-            except Exception as e:
-                print(f"Error processing {repo_info['url']}: {e}")
+                except Exception as e:
+                    print(f"Error processing {repo_info['url']}: {e}")
+                else:
+                    progress.repo_done(repo_info["url"])
+                # Saved after a failure too: chunks of the repo's changed files may already be deleted
+                manifest.save()
+                dedup.save()
+        embedder.flush_accesses()
+
+        BM25Index.from_collection(collection).save(tech_kb_path / INDEX_FILENAME)
+        export_snapshot(collection, tech_kb_path / SNAPSHOT_DIRNAME)
+        self._write_version(tech_kb_path)
+
+        return {
+            "tech_stack": tech_stack,
+            "total_chunks": collection.count(),
+            "chunks_upserted": progress.chunks,
+            "repos_processed": len(repos),
+            **stats,
+            "elapsed_seconds": round(progress.elapsed, 2),
+            "chunks_per_second": round(progress.rate, 1),
+            "embedding_cache_hits": embedder.hits,
+            "embeddings_computed": embedder.misses
+        }
+
+    def _ingest_repo(
+        self,
+        pool,
+        collection,
+        manifest: "KBManifest",
+        dedup: ChunkDeduplicator,
+        embedder,
+        repo_path: Path,
+        repo_info: dict,
+        tech_stack: str,
+        full: bool,
+        batch_size: int,
+        embed_batch_size: int,
+        progress: "IngestProgress",
+        stats: dict
+    ) -> None:
+        """Walk, read, parse, batch and upsert one repo's files as a stream.
+
+        At most EXTRACT_QUEUE_SIZE files are in the parser processes at once and at most
+        `batch_size` chunks wait for upsert, so memory does not grow with repo size.
+        """
+        url = repo_info["url"]
+        category = repo_info.get("category", "general")
+        known_hashes = {} if full else manifest.file_hashes(url)
+        
+        def tasks() -> Iterator[tuple]:
+            for file_path in self._iter_files(repo_path, repo_info):
+                rel_path = file_path.relative_to(repo_path).as_posix()
+                yield str(file_path), rel_path, tech_stack, category, url, known_hashes.get(rel_path)
+        
+        seen_paths = set()
+        dirty: set[str] = set()
+        batch: list[CodeChunk] = []
+        added: list[str] = []
+        try:
+            for extracted in _bounded_map(pool, _extract_file, tasks(), EXTRACT_QUEUE_SIZE):
+                if extracted.skipped:
+                    stats["files_skipped"] += 1
+                    if extracted.skipped == "error":
+                        # Keep the file's previous chunks until it can be read and parsed again
+                        seen_paths.add(extracted.path)
+                    continue
+                seen_paths.add(extracted.path)
+                if extracted.chunks is None:
+                    stats["files_unchanged"] += 1
+                    continue
+                stats["files_changed"] += 1
+                
+                # Old chunks of the file leave their duplicate groups before the new ones join
+                stats["chunks_deleted"] += self._remove_chunks(
+                    collection, dedup, manifest.chunk_ids(url, extracted.path), dirty, batch_size
+                )
+                # Ids repeat when a file defines the same name twice; the last definition wins
+                chunks = list({chunk.id: chunk for chunk in extracted.chunks}.values())
+                manifest.set_file(url, extracted.path, extracted.content_hash, [c.id for c in chunks])
+                
+                for chunk in chunks:
+                    added.append(chunk.id)
+                    rep_id = dedup.add(chunk)
+                    if rep_id is not None:
+                        dirty.add(rep_id)
+                        stats["duplicates_skipped"] += 1
+                        continue
+                    batch.append(chunk)
+                    if len(batch) >= batch_size:
+                        self._upsert_batch(collection, batch, embedder, embed_batch_size, dedup)
+                        progress.update(len(batch))
+                        batch = []
+            
+            removed_ids = []
+            for path in set(manifest.file_hashes(url)) - seen_paths:
+                stats["files_removed"] += 1
+                removed_ids.extend(manifest.remove_file(url, path))
+            stats["chunks_deleted"] += self._remove_chunks(collection, dedup, removed_ids, dirty, batch_size)
+            
+            # Flush before the caller saves so the manifest never records chunks that were not stored
+            if batch:
+                self._upsert_batch(collection, batch, embedder, embed_batch_size, dedup)
+                progress.update(len(batch))
+        except Exception:
+            # Chunks still waiting in `batch` were never stored, so later repos must not dedupe against them.
+            # Invalidated hashes make the next build re-extract the repo and delete what this run left behind
+            for chunk_id in added:
+                dedup.remove(chunk_id)
+            manifest.invalidate_repo(url)
+            raise
+        self._update_sources(collection, dedup, dirty, batch_size)
+
+    def _upsert_batch(self, collection, chunks: list[CodeChunk], embedder, embed_batch_size: int, dedup=None) -> None:
+        # Ids repeat when a file defines the same name twice; the last definition wins, as with per-chunk upserts
+        unique = list({chunk.id: chunk for chunk in chunks}.values())
+        documents = [chunk.code for chunk in unique]
+        
+        embeddings = []
+        for batch in _batched(documents, embed_batch_size):
+            embeddings.extend(embedder(batch))
+        
+        collection.upsert(
+            ids=[chunk.id for chunk in unique],
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=[
+                dedup.metadata(chunk.id) if dedup is not None else {
+                    "file_path": chunk.file_path,
+                    "chunk_type": chunk.chunk_type,
+                    "category": chunk.category,
+                    "repo": chunk.repo_url
+                }
+                for chunk in unique
+            ]
+        )
+
+    def _remove_chunks(self, collection, dedup, ids: list[str], dirty: set[str], batch_size: int) -> int:
+        """Remove chunks from their duplicate groups; a stored chunk is deleted only once no file shares it."""
+        to_delete = []
+        for chunk_id in dict.fromkeys(ids):
+            action, rep_id = dedup.remove(chunk_id)
+            if action == "detach":
+                dirty.add(rep_id)
+            elif action == "promote":
+                self._promote(collection, chunk_id, rep_id, dedup)
+                to_delete.append(chunk_id)
+            else:
+                to_delete.append(chunk_id)
+        return self._delete_ids(collection, to_delete, batch_size)
+
+    def _promote(self, collection, old_id: str, new_id: str, dedup) -> None:
+        # The group's stored copy now stands for a surviving member, so re-key it under that member's id
+        stored = collection.get(ids=[old_id], include=["documents", "embeddings"])
+        if not stored["ids"]:
+            return
+        collection.upsert(
+            ids=[new_id],
+            documents=stored["documents"],
+            embeddings=stored["embeddings"],
+            metadatas=[dedup.metadata(new_id)]
+        )
 
-        return {"tech_stack": tech_stack, "total_chunks": total_chunks, "repos_processed": len(repos)}
+    def _update_sources(self, collection, dedup, rep_ids: set[str], batch_size: int) -> None:
+        live = [rep_id for rep_id in rep_ids if dedup.is_representative(rep_id)]
+        for batch in _batched(live, batch_size):
+            collection.update(ids=batch, metadatas=[dedup.metadata(rep_id) for rep_id in batch])
+
+    def _write_version(self, tech_kb_path: Path) -> None:
+        version_path = tech_kb_path / VERSION_FILENAME
+        tmp_path = version_path.with_suffix(".tmp")
+        tmp_path.write_text(uuid.uuid4().hex, encoding="utf-8")
+        tmp_path.replace(version_path)
+
+    def _delete_ids(self, collection, ids: list[str], batch_size: int) -> int:
+        ids = list(dict.fromkeys(ids))
+        for batch in _batched(ids, batch_size):
+            collection.delete(ids=batch)
+        return len(ids)
+
+    def _clone_repo(self, url: str, repos_path: Path, update: bool = False) -> Path:
+        if Path(url).is_dir():
+            return Path(url)
 
-    def _clone_repo(self, url: str, repos_path: Path) -> Path:
         repo_name = url.split("/")[-1].replace(".git", "")
         repo_path = repos_path / repo_name
 
         if repo_path.exists():
+            if update:
+                self._update_repo(repo_path)
             return repo_path
 
         subprocess.run(
@@ -92,28 +367,65 @@ class TechStackKnowledgeBuilder:
         )
         return repo_path
 
-    def _extract_chunks(self, repo_path: Path, repo_info: dict, tech_stack: str) -> list[CodeChunk]:
-        chunks = []
-        extract_paths = repo_info.get("extract_paths", ["**/*"])
-        category = repo_info.get("category", "general")
+    def _update_repo(self, repo_path: Path) -> None:
+        subprocess.run(
+            ["git", "-C", str(repo_path), "fetch", "--depth", "1", "origin"],
+            capture_output=True,
+            check=True
+        )
+        subprocess.run(
+            ["git", "-C", str(repo_path), "reset", "--hard", "FETCH_HEAD"],
+            capture_output=True,
+            check=True
+        )
 
-        for pattern in extract_paths:
+    def _iter_files(self, repo_path: Path, repo_info: dict) -> Iterable[Path]:
+        seen = set()
+        for pattern in repo_info.get("extract_paths", ["**/*"]):
             if pattern.startswith("!"):
                 continue
             for file_path in repo_path.glob(pattern):
-                if not file_path.is_file():
+                if file_path in seen or not file_path.is_file():
                     continue
-                new_chunks = self._parse_file(file_path, tech_stack, category, repo_info["url"])
-                chunks.extend(new_chunks)
-
-        return chunks
+                seen.add(file_path)
+                yield file_path
 
-    def _parse_file(self, file_path: Path, tech_stack: str, category: str, repo_url: str) -> list[CodeChunk]:
+    def _extract_file(
+        self,
+        file_path: Path,
+        rel_path: str,
+        tech_stack: str,
+        category: str,
+        repo_url: str,
+        known_hash: Optional[str] = None
+    ) -> FileExtraction:
+        """Read, hash and chunk one file; chunks stay None when its hash equals `known_hash`."""
         try:
-            content = file_path.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            return []
+            if file_path.stat().st_size > MAX_FILE_BYTES:
+                return FileExtraction(rel_path, "", skipped="too_large")
+            with open(file_path, "rb") as f:
+                head = f.read(BINARY_SNIFF_BYTES)
+                if b"\0" in head:
+                    return FileExtraction(rel_path, "", skipped="binary")
+                raw = head + f.read(MAX_FILE_BYTES + 1 - len(head))
+        except OSError:
+            return FileExtraction(rel_path, "", skipped="error")
+        if len(raw) > MAX_FILE_BYTES:
+            return FileExtraction(rel_path, "", skipped="too_large")
+        
+        content_hash = hashlib.sha256(raw).hexdigest()
+        if known_hash == content_hash:
+            return FileExtraction(rel_path, content_hash)
+        
+        try:
+            content = raw.decode("utf-8", errors="ignore")
+            chunks = self._parse_content(content, file_path, tech_stack, category, repo_url)
+        except Exception as e:
+            print(f"Error parsing {file_path}: {e}")
+            return FileExtraction(rel_path, content_hash, skipped="error")
+        return FileExtraction(rel_path, content_hash, chunks)
 
+    def _parse_content(self, content: str, file_path: Path, tech_stack: str, category: str, repo_url: str) -> list[CodeChunk]:
         suffix = file_path.suffix.lower()
         
         if tech_stack == "python" or suffix == ".py":
@@ -126,18 +438,32 @@ class TechStackKnowledgeBuilder:
             return self._parse_generic(content, str(file_path), category, repo_url)
 
     def _parse_python(self, content: str, file_path: str, category: str, repo_url: str) -> list[CodeChunk]:
-        chunks = []
         try:
             tree = ast.parse(content)
         except SyntaxError:
             return self._parse_generic(content, file_path, category, repo_url)
 
-        for node in ast.walk(tree):
+        chunks = []
+        self._collect_python_chunks(tree.body, "", content, file_path, category, repo_url, chunks)
+        return chunks if chunks else self._parse_generic(content, file_path, category, repo_url)
+
+    def _collect_python_chunks(
+        self,
+        body: list,
+        prefix: str,
+        content: str,
+        file_path: str,
+        category: str,
+        repo_url: str,
+        chunks: list[CodeChunk]
+    ) -> None:
+        # A class is one chunk with its methods inside it; only classes too big to be useful whole are split into methods
+        for node in body:
             if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
                 chunk_code = ast.get_source_segment(content, node)
                 if chunk_code and len(chunk_code) > 50:
                     chunks.append(CodeChunk(
-                        id=self._generate_id(file_path, node.name),
+                        id=self._generate_id(file_path, prefix + node.name),
                         code=chunk_code,
                         file_path=file_path,
                         chunk_type="function",
@@ -146,48 +472,41 @@ class TechStackKnowledgeBuilder:
                     ))
             elif isinstance(node, ast.ClassDef):
                 chunk_code = ast.get_source_segment(content, node)
-                if chunk_code and len(chunk_code) > 100:
+                if chunk_code and len(chunk_code) > MAX_PARENT_CHUNK_CHARS:
+                    self._collect_python_chunks(node.body, f"{prefix}{node.name}.", content, file_path, category, repo_url, chunks)
+                elif chunk_code and len(chunk_code) > 100:
                     chunks.append(CodeChunk(
-                        id=self._generate_id(file_path, node.name),
+                        id=self._generate_id(file_path, prefix + node.name),
                         code=chunk_code,
                         file_path=file_path,
                         chunk_type="class",
                         category=category,
                         repo_url=repo_url
                     ))
-
-        return chunks if chunks else self._parse_generic(content, file_path, category, repo_url)
+            elif isinstance(node, (ast.If, ast.Try, ast.With)):
+                # Module-level `if TYPE_CHECKING:` / `try: ... except ImportError:` blocks hold definitions too
+                for block in (node.body, getattr(node, "orelse", []), getattr(node, "finalbody", [])):
+                    self._collect_python_chunks(block, prefix, content, file_path, category, repo_url, chunks)
+                for handler in getattr(node, "handlers", []):
+                    self._collect_python_chunks(handler.body, prefix, content, file_path, category, repo_url, chunks)
 
     def _parse_jsx_vue(self, content: str, file_path: str, category: str, repo_url: str) -> list[CodeChunk]:
-        chunks = []
-        
-        component_pattern = r'(?:export\s+(?:default\s+)?)?(?:function|const)\s+(\w+)\s*[=\(]'
-        matches = re.finditer(component_pattern, content)
+        if file_path.lower().endswith(".vue"):
+            declarations = chunk_vue(content)
+        else:
+            declarations = chunk_js(content)
         
-        for match in matches:
-            start = match.start()
-            depth = 0
-            end = start
-            
-            for i, char in enumerate(content[start:], start):
-                if char == '{':
-                    depth += 1
-                elif char == '}':
-                    depth -= 1
-                    if depth == 0:
-                        end = i + 1
-                        break
-            
-            chunk_code = content[start:end]
-            if len(chunk_code) > 100:
-                chunks.append(CodeChunk(
-                    id=self._generate_id(file_path, match.group(1)),
-                    code=chunk_code,
-                    file_path=file_path,
-                    chunk_type="component",
-                    category=category,
-                    repo_url=repo_url
-                ))
+        chunks = [
+            CodeChunk(
+                id=self._generate_id(file_path, declaration.name),
+                code=declaration.code,
+                file_path=file_path,
+                chunk_type=declaration.kind,
+                category=category,
+                repo_url=repo_url
+            )
+            for declaration in declarations if len(declaration.code) > 100
+        ]
 
         return chunks if chunks else self._parse_generic(content, file_path, category, repo_url)
 
@@ -219,17 +538,145 @@ class TechStackKnowledgeBuilder:
         return hashlib.md5(f"{file_path}:{identifier}".encode()).hexdigest()
 
 
+class KBManifest:
+    """Per-tech record of `repo -> file path -> (content hash, chunk ids)` from the last build."""
+
+    def __init__(self, path: Path, repos: Optional[dict] = None):
+        self.path = path
+        self.repos: dict[str, dict[str, dict]] = repos or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "KBManifest":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("repos", {}))
+
+    def save(self) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"version": MANIFEST_VERSION, "repos": self.repos}), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def file_hashes(self, repo_url: str) -> dict[str, str]:
+        return {path: entry["hash"] for path, entry in self.repos.get(repo_url, {}).items()}
+
+    def chunk_ids(self, repo_url: str, path: str) -> list[str]:
+        return self.repos.get(repo_url, {}).get(path, {}).get("chunk_ids", [])
+
+    def set_file(self, repo_url: str, path: str, content_hash: str, chunk_ids: list[str]) -> None:
+        self.repos.setdefault(repo_url, {})[path] = {"hash": content_hash, "chunk_ids": chunk_ids}
+
+    def invalidate_repo(self, repo_url: str) -> None:
+        """Keep the repo's chunk ids but forget its hashes, so every file is re-extracted next build."""
+        for entry in self.repos.get(repo_url, {}).values():
+            entry["hash"] = None
+
+    def remove_file(self, repo_url: str, path: str) -> list[str]:
+        entry = self.repos.get(repo_url, {}).pop(path, None)
+        return entry["chunk_ids"] if entry else []
+
+
+class IngestProgress:
+    def __init__(self, tech_stack: str):
+        self.tech_stack = tech_stack
+        self.chunks = 0
+        self.repos = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.chunks / self.elapsed if self.elapsed > 0 else 0.0
+
+    def update(self, chunks: int) -> None:
+        self.chunks += chunks
+        now = time.monotonic()
+        if now - self._last_report >= PROGRESS_INTERVAL_SECONDS:
+            self._last_report = now
+            self.report()
+
+    def repo_done(self, url: str) -> None:
+        self.repos += 1
+        print(f"[{self.tech_stack}] finished {url} ({self.repos} repos)")
+        self.report()
+
+    def report(self) -> None:
+        print(f"[{self.tech_stack}] {self.chunks} chunks in {self.elapsed:.1f}s ({self.rate:.1f} chunks/sec)")
+
+
+def _extract_file(
+    file_path: str,
+    rel_path: str,
+    tech_stack: str,
+    category: str,
+    repo_url: str,
+    known_hash: Optional[str] = None
+) -> FileExtraction:
+    return TechStackKnowledgeBuilder()._extract_file(Path(file_path), rel_path, tech_stack, category, repo_url, known_hash)
+
+
+def _bounded_map(pool, fn, arg_tuples: Iterable[tuple], max_pending: int) -> Iterator:
+    """Yield `fn(*args)` results in completion order, keeping at most `max_pending` tasks submitted."""
+    pending = set()
+    for args in arg_tuples:
+        pending.add(pool.submit(fn, *args))
+        if len(pending) >= max(1, max_pending):
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    for future in as_completed(pending):
+        yield future.result()
+
+
+def _batched(items: list, size: int) -> Iterable[list]:
+    size = max(1, size)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
 if __name__ == "__main__":
-    import sys
+    import argparse
     
-    if len(sys.argv) < 2:
-        print("Usage: python -m agent.knowledge_base.kb_builder <tech_stack>")
-        print("Example: python -m agent.knowledge_base.kb_builder react")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        prog="python -m agent.knowledge_base.kb_builder",
+        description="Build the knowledge base for a tech stack, e.g. react"
+    )
+    parser.add_argument("tech_stack")
+    parser.add_argument("max_repos", nargs="?", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="Processes for cloning and parsing")
+    parser.add_argument("--batch-size", type=int, default=UPSERT_BATCH_SIZE, help="Chunks per upsert")
+    parser.add_argument("--embed-batch-size", type=int, default=None, help="Documents per embedding call (default: backend batch_size)")
+    parser.add_argument("--embedding-backend", default=None, help="Override the registry's embedding backend, e.g. hashing")
+    parser.add_argument("--embedding-threads", type=int, default=None, help="Override the embedding backend's thread count")
+    parser.add_argument("--update", action="store_true", help="Fetch the latest commit of already cloned repos")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-chunk every file")
+    args = parser.parse_args()
     
-    tech_stack = sys.argv[1]
-    max_repos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    embedding_config = None
+    if args.embedding_backend or args.embedding_threads is not None:
+        tech_info = get_kb_manager().get_tech_info(args.tech_stack) or {}
+        embedding_config = dict(tech_info.get("embedding") or {})
+        if args.embedding_backend:
+            embedding_config["backend"] = args.embedding_backend
+        if args.embedding_threads is not None:
+            embedding_config["threads"] = args.embedding_threads
     
     builder = TechStackKnowledgeBuilder()
-    result = builder.build_tech_kb(tech_stack, max_repos)
+    result = builder.build_tech_kb(
+        args.tech_stack,
+        args.max_repos,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        embed_batch_size=args.embed_batch_size,
+        update=args.update,
+        full=args.full,
+        embedding_config=embedding_config
+    )
     print(f"Built KB: {result}")
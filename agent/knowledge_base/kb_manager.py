@@ -1,4 +1,9 @@
+import asyncio
 import json
+import math
+import os
+import re
+import threading
 from pathlib import Path
 from typing import Optional
 from concurrent.futures import ThreadPoolExecutor
@@ -9,6 +14,51 @@ try:
 except ImportError:
     chromadb = None
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from agent.knowledge_base.embeddings import cached_embedding_function
+from agent.knowledge_base.embedding_backends import config_from_metadata, create_embedding_backend
+from agent.knowledge_base.lexical_index import BM25Index, INDEX_FILENAME, reciprocal_rank_fusion
+from agent.knowledge_base.snapshot import SNAPSHOT_DIRNAME, SnapshotCollection, is_snapshot
+from agent.knowledge_base.query_cache import QueryResultCache, normalize_query
+
+
+KB_RETRIEVAL_MODE = os.getenv("KB_RETRIEVAL_MODE", "hybrid")
+LEXICAL_CANDIDATES = int(os.getenv("KB_LEXICAL_CANDIDATES", "20"))
+# Share of n_results the ANN query still fetches in hybrid mode; BM25 candidates are ranked by exact distance instead
+HYBRID_VECTOR_FRACTION = float(os.getenv("KB_HYBRID_VECTOR_FRACTION", "0.5"))
+# Snapshots are scanned brute-force (fast to open, linear per query); Chroma's ANN index scales better for large KBs
+KB_USE_SNAPSHOT = os.getenv("KB_USE_SNAPSHOT", "false").lower() in ("1", "true", "yes")
+KB_QUERY_CACHE_SIZE = int(os.getenv("KB_QUERY_CACHE_SIZE", "2048"))
+KB_QUERY_CACHE_TTL = float(os.getenv("KB_QUERY_CACHE_TTL", "3600"))
+# Written by the builder after every build; a new stamp invalidates cached results and open collections
+VERSION_FILENAME = "VERSION"
+RRF_K = 60
+
+
+_clients: dict[str, "chromadb.ClientAPI"] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(kb_path: Path):
+    key = str(kb_path.resolve())
+    with _clients_lock:
+        if key not in _clients:
+            kb_path.mkdir(parents=True, exist_ok=True)
+            _clients[key] = chromadb.PersistentClient(
+                path=str(kb_path),
+                settings=Settings(anonymized_telemetry=False)
+            )
+        return _clients[key]
+
+
+def _drop_client(kb_path: Path) -> None:
+    with _clients_lock:
+        _clients.pop(str(kb_path.resolve()), None)
+
 
 class KnowledgeBaseManager:
     def __init__(self, base_path: str = ".appbuilder"):
@@ -16,6 +66,11 @@ class KnowledgeBaseManager:
         self.registry_path = self.base_path / "config" / "tech_stack_registry.json"
         self.registry = self._load_registry()
         self._loaded_collections: dict = {}
+        self._lexical_indexes: dict[str, Optional[BM25Index]] = {}
+        self._embedders: dict = {}
+        self._versions: dict[str, tuple[int, str]] = {}
+        self.query_cache = QueryResultCache(KB_QUERY_CACHE_SIZE, KB_QUERY_CACHE_TTL)
+        self._lock = threading.RLock()
 
     def _load_registry(self) -> dict:
         if not self.registry_path.exists():
@@ -32,53 +87,281 @@ class KnowledgeBaseManager:
     def get_tech_info(self, tech_stack: str) -> Optional[dict]:
         return self.registry.get("tech_stacks", {}).get(tech_stack)
 
+    def match_techs(self, text: str) -> list[str]:
+        """Techs whose id, aliases or keywords appear in `text` (cheap guess, no LLM)."""
+        text_lower = text.lower()
+        matches = []
+        for tech_id, info in self.registry.get("tech_stacks", {}).items():
+            terms = [tech_id, *info.get("aliases", []), *info.get("keywords", [])]
+            if any(re.search(rf"(?<![\w.]){re.escape(term.lower())}(?![\w])", text_lower) for term in terms):
+                matches.append(tech_id)
+        return matches
+
     def _get_collection(self, tech_stack: str):
-        if chromadb is None:
-            raise ImportError("chromadb not installed. Run: pip install chromadb")
-        
-        if tech_stack in self._loaded_collections:
-            return self._loaded_collections[tech_stack]
+        collection = self._loaded_collections.get(tech_stack)
+        if collection is not None:
+            return collection
+
+        with self._lock:
+            if tech_stack in self._loaded_collections:
+                return self._loaded_collections[tech_stack]
+
+            tech_info = self.get_tech_info(tech_stack)
+            if not tech_info:
+                raise ValueError(f"Unknown tech stack: {tech_stack}")
+
+            # Opt-in: a snapshot written by the builder is a read-only, memory-mapped copy that opens without Chroma
+            snapshot_path = Path(tech_info["kb_path"]) / SNAPSHOT_DIRNAME
+            if KB_USE_SNAPSHOT and is_snapshot(snapshot_path):
+                collection = SnapshotCollection.open(snapshot_path)
+                self._loaded_collections[tech_stack] = collection
+                return collection
 
+            if chromadb is None:
+                raise ImportError("chromadb not installed. Run: pip install chromadb")
+
+            client = _get_client(self._chroma_path(tech_info))
+            
+            collection = client.get_or_create_collection(
+                name=f"{tech_stack}_patterns",
+                metadata={"tech_stack": tech_stack}
+            )
+            
+            self._loaded_collections[tech_stack] = collection
+            return collection
+
+    def _embed(self, tech_stack: str, texts: list[str]) -> list[list[float]]:
+        """Embed query texts with the backend the tech's collection was built with, through the embedding cache."""
+        embedder = self._embedders.get(tech_stack)
+        if embedder is None:
+            with self._lock:
+                embedder = self._embedders.get(tech_stack)
+                if embedder is None:
+                    collection = self._get_collection(tech_stack)
+                    config = config_from_metadata(collection.metadata)
+                    if config is None:
+                        config = (self.get_tech_info(tech_stack) or {}).get("embedding")
+                    embedder = cached_embedding_function(create_embedding_backend(config))
+                    self._embedders[tech_stack] = embedder
+        return embedder(texts)
+
+    def _get_lexical_index(self, tech_stack: str) -> Optional[BM25Index]:
+        if tech_stack in self._lexical_indexes:
+            return self._lexical_indexes[tech_stack]
+        with self._lock:
+            if tech_stack not in self._lexical_indexes:
+                tech_info = self.get_tech_info(tech_stack) or {}
+                index_path = Path(tech_info.get("kb_path", "")) / INDEX_FILENAME
+                self._lexical_indexes[tech_stack] = BM25Index.load(index_path) if tech_info else None
+            return self._lexical_indexes[tech_stack]
+
+    def _collection_version(self, tech_stack: str) -> str:
+        """The tech's build stamp; reopens the tech's collection when it changed since last seen."""
         tech_info = self.get_tech_info(tech_stack)
         if not tech_info:
-            raise ValueError(f"Unknown tech stack: {tech_stack}")
+            return ""
+        path = Path(tech_info["kb_path"]) / VERSION_FILENAME
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return ""
 
-        kb_path = Path(tech_info["kb_path"]) / "chroma"
-        kb_path.mkdir(parents=True, exist_ok=True)
+        seen = self._versions.get(tech_stack)
+        if seen is not None and seen[0] == mtime:
+            return seen[1]
         
-        client = chromadb.PersistentClient(
-            path=str(kb_path),
-            settings=Settings(anonymized_telemetry=False)
-        )
-        
-        collection = client.get_or_create_collection(
-            name=f"{tech_stack}_patterns",
-            metadata={"tech_stack": tech_stack}
-        )
-        
-        self._loaded_collections[tech_stack] = collection
-        return collection
+        with self._lock:
+            try:
+                version = path.read_text(encoding="utf-8").strip()
+            except OSError:
+                return ""
+            self._versions[tech_stack] = (mtime, version)
+            if seen is not None and seen[1] != version:
+                self.reload(tech_stack)
+        return version
+
+    def get_query_cache_stats(self) -> dict:
+        return self.query_cache.stats()
+
+    def _chroma_path(self, tech_info: dict) -> Path:
+        return Path(tech_info["kb_path"]) / "chroma"
+
+    def reload(self, tech_stack: Optional[str] = None) -> None:
+        """Drop open collections (one tech or all) so the next query reopens them, e.g. after a rebuild."""
+        with self._lock:
+            techs = [tech_stack] if tech_stack else list(self._loaded_collections)
+            for tech in techs:
+                self._loaded_collections.pop(tech, None)
+                self._lexical_indexes.pop(tech, None)
+                self._embedders.pop(tech, None)
+                self.query_cache.invalidate(tech)
+                tech_info = self.get_tech_info(tech)
+                if tech_info:
+                    _drop_client(self._chroma_path(tech_info))
+
+    def reload_registry(self) -> None:
+        with self._lock:
+            self.registry = self._load_registry()
+            self._loaded_collections.clear()
+            self._lexical_indexes.clear()
+            self._embedders.clear()
+            self.query_cache.invalidate()
 
     def query_single_tech(
         self,
         tech_stack: str,
         query: str,
         n_results: int = 5,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        mode: Optional[str] = None
     ) -> list[dict]:
-        collection = self._get_collection(tech_stack)
+        return self._search(tech_stack, [query], n_results, category, mode)[0]
+
+    async def aquery_single_tech(
+        self,
+        tech_stack: str,
+        query: str,
+        n_results: int = 5,
+        category: Optional[str] = None,
+        mode: Optional[str] = None
+    ) -> list[dict]:
+        return await asyncio.to_thread(self.query_single_tech, tech_stack, query, n_results, category, mode)
+
+    async def aquery_batch(
+        self,
+        queries: list[tuple[str, str]],
+        n_results: int = 5,
+        category: Optional[str] = None,
+        mode: Optional[str] = None
+    ) -> list[list[dict]]:
+        return await asyncio.to_thread(self.query_batch, queries, n_results, category, mode)
+
+    def query_batch(
+        self,
+        queries: list[tuple[str, str]],
+        n_results: int = 5,
+        category: Optional[str] = None,
+        mode: Optional[str] = None
+    ) -> list[list[dict]]:
+        """Run many (tech_stack, query) lookups with one collection query per tech.
+
+        Results come back in input order; a tech that cannot be queried yields empty lists.
+        """
+        by_tech: dict[str, list[int]] = {}
+        for i, (tech_stack, _) in enumerate(queries):
+            by_tech.setdefault(tech_stack, []).append(i)
+
+        results: list[list[dict]] = [[] for _ in queries]
         
-        where_filter = None
-        if category:
-            where_filter = {"category": category}
+        for tech_stack, indices in by_tech.items():
+            try:
+                tech_results = self._search(tech_stack, [queries[i][1] for i in indices], n_results, category, mode)
+            except Exception:
+                continue
+            for i, formatted in zip(indices, tech_results):
+                results[i] = formatted
+
+        return results
+
+    def _search(
+        self,
+        tech_stack: str,
+        queries: list[str],
+        n_results: int,
+        category: Optional[str],
+        mode: Optional[str]
+    ) -> list[list[dict]]:
+        """Serve queries from the result cache, searching only the ones it misses."""
+        version = self._collection_version(tech_stack)
+        mode = mode or KB_RETRIEVAL_MODE
+        keys = [(tech_stack, normalize_query(q), n_results, category, mode, version) for q in queries]
+
+        results: list[Optional[list[dict]]] = [self.query_cache.get(key) for key in keys]
+        missing = [i for i, cached in enumerate(results) if cached is None]
+        if missing:
+            fresh = self._search_uncached(tech_stack, [queries[i] for i in missing], n_results, category, mode)
+            for i, formatted in zip(missing, fresh):
+                self.query_cache.put(keys[i], formatted)
+                results[i] = formatted
+        return results
 
-        results = collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            where=where_filter
-        )
+    def _search_uncached(
+        self,
+        tech_stack: str,
+        queries: list[str],
+        n_results: int,
+        category: Optional[str],
+        mode: str
+    ) -> list[list[dict]]:
+        """Vector search, fused with BM25 rankings when mode is "hybrid" and the tech has a lexical index.
+
+        In hybrid mode BM25 runs first and pre-filters: its candidates are ranked by exact
+        vector distance, so the ANN query only fetches HYBRID_VECTOR_FRACTION of n_results
+        to catch semantic matches that share no terms with the query.
+        """
+        collection = self._get_collection(tech_stack)
+        where_filter = {"category": category} if category else None
+        embeddings = self._embed(tech_stack, queries)
+
+        index = self._get_lexical_index(tech_stack) if mode == "hybrid" and np is not None else None
+        lexical = None
+        if index is not None:
+            candidates = max(LEXICAL_CANDIDATES, n_results)
+            lexical = [index.search(query, candidates, category) for query in queries]
+            if not any(lexical):
+                lexical = None
+
+        vector_results = n_results if lexical is None else max(1, math.ceil(n_results * HYBRID_VECTOR_FRACTION))
+        raw = collection.query(query_embeddings=embeddings, n_results=vector_results, where=where_filter)
+        vector = [self._format_results(raw, tech_stack, i) for i in range(len(queries))]
+        if lexical is None:
+            return vector
+        return self._fuse(collection, tech_stack, embeddings, vector, lexical, n_results)
+
+    def _fuse(
+        self,
+        collection,
+        tech_stack: str,
+        embeddings: list[list[float]],
+        vector: list[list[dict]],
+        lexical: list[list[tuple[str, float]]],
+        n_results: int
+    ) -> list[list[dict]]:
+        known: dict[str, dict] = {}
+        candidate_ids = list({doc_id for hits in lexical for doc_id, _ in hits})
+        fetched = collection.get(ids=candidate_ids, include=["documents", "metadatas", "embeddings"])
+        candidate_vectors = {}
+        for doc_id, doc, metadata, embedding in zip(
+            fetched["ids"], fetched["documents"], fetched["metadatas"], fetched["embeddings"]
+        ):
+            known[doc_id] = {"id": doc_id, "code": doc, "tech_stack": tech_stack, "metadata": metadata or {}}
+            candidate_vectors[doc_id] = embedding
+        space = getattr(collection, "space", None) or (collection.metadata or {}).get("hnsw:space", "l2")
+
+        fused_ids = []
+        for query_embedding, vector_hits, lexical_hits in zip(embeddings, vector, lexical):
+            # One vector ranking over the ANN hits and the BM25 candidates, by the collection's distance
+            ranked = {hit["id"]: 1 - hit["relevance_score"] for hit in vector_hits}
+            known.update((hit["id"], hit) for hit in vector_hits)
+            ids = [doc_id for doc_id, _ in lexical_hits if doc_id in candidate_vectors and doc_id not in ranked]
+            if ids:
+                distances = _distances(query_embedding, np.asarray([candidate_vectors[i] for i in ids]), space)
+                ranked.update(zip(ids, distances.tolist()))
+            fused = reciprocal_rank_fusion(
+                [sorted(ranked, key=ranked.get), [doc_id for doc_id, _ in lexical_hits]],
+                k=RRF_K
+            )
+            fused_ids.append(fused[:n_results])
 
-        return self._format_results(results, tech_stack)
+        # Scale fused scores into (0, 1]; 2 / (k + 1) is an id ranked first by both retrievers
+        best_possible = 2.0 / (RRF_K + 1)
+        return [
+            [
+                {**known[doc_id], "relevance_score": score / best_possible}
+                for doc_id, score in fused if doc_id in known
+            ]
+            for fused in fused_ids
+        ]
 
     def query_multiple_techs(
         self,
@@ -104,17 +387,19 @@ class KnowledgeBaseManager:
 
         return results
 
-    def _format_results(self, raw_results: dict, tech_stack: str) -> list[dict]:
+    def _format_results(self, raw_results: dict, tech_stack: str, index: int = 0) -> list[dict]:
         if not raw_results or not raw_results.get("documents"):
             return []
 
         formatted = []
-        documents = raw_results["documents"][0]
-        metadatas = raw_results.get("metadatas", [[]])[0]
-        distances = raw_results.get("distances", [[]])[0]
+        ids = (raw_results.get("ids") or [[]] * (index + 1))[index] or []
+        documents = raw_results["documents"][index]
+        metadatas = (raw_results.get("metadatas") or [[]] * (index + 1))[index] or []
+        distances = (raw_results.get("distances") or [[]] * (index + 1))[index] or []
 
         for i, doc in enumerate(documents):
             formatted.append({
+                "id": ids[i] if i < len(ids) else None,
                 "code": doc,
                 "tech_stack": tech_stack,
                 "metadata": metadatas[i] if i < len(metadatas) else {},
@@ -135,7 +420,33 @@ class KnowledgeBaseManager:
         return stats
 
     def update_tech_stats(self, tech_stack: str, chunks: int, repos: int) -> None:
-        if tech_stack in self.registry["tech_stacks"]:
-            self.registry["tech_stacks"][tech_stack]["total_chunks"] = chunks
-            self.registry["tech_stacks"][tech_stack]["total_repos"] = repos
-            self._save_registry()
+        with self._lock:
+            if tech_stack in self.registry["tech_stacks"]:
+                self.registry["tech_stacks"][tech_stack]["total_chunks"] = chunks
+                self.registry["tech_stacks"][tech_stack]["total_repos"] = repos
+                self._save_registry()
+
+
+_managers: dict[str, KnowledgeBaseManager] = {}
+_managers_lock = threading.Lock()
+
+
+def _distances(query, vectors, space: str):
+    """Distances from one query to each row of `vectors`, as Chroma computes them for `space`."""
+    query = np.asarray(query, dtype=np.float32)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    dots = vectors @ query
+    if space == "cosine":
+        return 1 - dots / np.clip(np.linalg.norm(vectors, axis=1) * np.linalg.norm(query), 1e-12, None)
+    if space == "ip":
+        return 1 - dots
+    return np.square(vectors).sum(axis=1) + np.square(query).sum() - 2 * dots
+
+
+def get_kb_manager(base_path: str = ".appbuilder") -> KnowledgeBaseManager:
+    """Return the process-wide manager for `base_path`, shared across requests and threads."""
+    key = str(Path(base_path).resolve())
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = KnowledgeBaseManager(base_path)
+        return _managers[key]
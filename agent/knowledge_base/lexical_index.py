@@ -0,0 +1,134 @@
+"""
+BM25 inverted index over knowledge-base chunks.
+
+Built by the KB builder next to each tech's Chroma collection and used by
+KnowledgeBaseManager for hybrid retrieval. Identifiers are indexed whole and
+split on camelCase/snake_case, so "useState" matches both `useState` and
+`use_state`-style code.
+"""
+
+import gzip
+import heapq
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+INDEX_FILENAME = "bm25.json.gz"
+INDEX_VERSION = 1
+
+_IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*|\d+")
+_WORD_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for identifier in _IDENTIFIER.findall(text):
+        lowered = identifier.lower()
+        if len(lowered) > 1:
+            tokens.append(lowered)
+        parts = _WORD_PART.findall(identifier)
+        if len(parts) > 1:
+            tokens.extend(p.lower() for p in parts if len(p) > 1)
+    return tokens
+
+
+class BM25Index:
+    def __init__(
+        self,
+        ids: list[str],
+        categories: list[Optional[str]],
+        lengths: list[int],
+        postings: dict[str, list[list[int]]],
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        self.ids = ids
+        self.categories = categories
+        self.lengths = lengths
+        self.postings = postings
+        self.k1 = k1
+        self.b = b
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    @classmethod
+    def build(cls, documents: Iterable[tuple[str, str, Optional[str]]]) -> "BM25Index":
+        """Index (id, text, category) triples."""
+        ids, categories, lengths = [], [], []
+        postings: dict[str, list[list[int]]] = {}
+        for doc_idx, (doc_id, text, category) in enumerate(documents):
+            counts = Counter(tokenize(text or ""))
+            ids.append(doc_id)
+            categories.append(category)
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append([doc_idx, tf])
+        return cls(ids, categories, lengths, postings)
+
+    @classmethod
+    def from_collection(cls, collection, page_size: int = 1000) -> "BM25Index":
+        def documents():
+            offset = 0
+            while True:
+                page = collection.get(limit=page_size, offset=offset, include=["documents", "metadatas"])
+                if not page["ids"]:
+                    return
+                metadatas = page.get("metadatas") or [None] * len(page["ids"])
+                for doc_id, text, metadata in zip(page["ids"], page["documents"], metadatas):
+                    yield doc_id, text, (metadata or {}).get("category")
+                offset += len(page["ids"])
+        return cls.build(documents())
+
+    def search(self, query: str, k: int = 10, category: Optional[str] = None) -> list[tuple[str, float]]:
+        if not self.ids:
+            return []
+        total = len(self.ids)
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_idx, tf in docs:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_idx] / (self.avg_length or 1))
+                scores[doc_idx] = scores.get(doc_idx, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        if category:
+            scores = {i: s for i, s in scores.items() if self.categories[i] == category}
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.ids[i], score) for i, score in best]
+
+    def save(self, path: Path) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "ids": self.ids,
+            "categories": self.categories,
+            "lengths": self.lengths,
+            "postings": self.postings
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["BM25Index"]:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return cls(data["ids"], data["categories"], data["lengths"], data["postings"])
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[tuple[str, float]]:
+    """Fuse ranked id lists; each list contributes 1 / (k + rank) per id."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,72 @@
+"""
+In-process LRU/TTL cache for knowledge-base query results.
+
+Planner, architect and coder repeat the same lookups within a project, and
+similar prompts repeat them across projects. Keys include the collection's
+version stamp, so results from before a rebuild are never served.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class QueryResultCache:
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, list[dict]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[list[dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Deep copies: results carry a nested metadata dict that callers may mutate
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: Hashable, results: list[dict]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tech_stack: Optional[str] = None) -> None:
+        """Drop every entry, or only those of one tech (keys start with the tech id)."""
+        with self._lock:
+            if tech_stack is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == tech_stack]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
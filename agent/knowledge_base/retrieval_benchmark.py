@@ -0,0 +1,282 @@
+"""
+Offline retrieval quality and latency benchmark for the knowledge base.
+
+    python -m agent.knowledge_base.retrieval_benchmark --output bench.json
+    python -m agent.knowledge_base.retrieval_benchmark --baseline bench.json
+
+Each tech under benchmark_fixtures/ has small local repos and a labeled query
+set (queries.json). The benchmark builds a throwaway KB from those repos with
+the real builder, runs every query through KnowledgeBaseManager per retrieval
+mode, and reports recall@k, MRR, p50/p95/p99 query latency and on-disk index
+size. No network is needed: the default embedding backend is "hashing".
+
+A query's relevant chunks are labeled by file path (relative to the fixture
+repos directory) and an optional symbol that must appear in the chunk's code.
+"""
+
+import json
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from agent.knowledge_base.embedding_benchmark import _percentile
+from agent.knowledge_base.kb_builder import TechStackKnowledgeBuilder
+from agent.knowledge_base.kb_manager import KB_USE_SNAPSHOT, KnowledgeBaseManager
+from agent.knowledge_base.query_cache import QueryResultCache
+
+FIXTURES_PATH = Path(__file__).parent / "benchmark_fixtures"
+BENCHMARK_TECHS = ["react", "python", "nodejs", "docker"]
+BENCHMARK_MODES = ["vector", "hybrid"]
+BENCHMARK_EMBEDDING = {"backend": "hashing"}
+COMPARED_METRICS = ["recall_at_k", "mrr", "p50_ms", "p95_ms", "p99_ms"]
+
+
+def load_fixture(tech_stack: str) -> dict:
+    path = FIXTURES_PATH / tech_stack / "queries.json"
+    if not path.exists():
+        raise ValueError(f"No benchmark fixture for {tech_stack}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def fixture_repos(tech_stack: str, fixture: dict) -> list[dict]:
+    """Repo entries for the builder; each url is the fixture repo's local directory."""
+    repos = []
+    for repo in fixture["repos"]:
+        local_path = (FIXTURES_PATH / tech_stack / repo["path"]).resolve()
+        repos.append({
+            "url": str(local_path),
+            "category": repo.get("category", "general"),
+            "extract_paths": repo.get("extract_paths", ["**/*"])
+        })
+    return repos
+
+
+def is_relevant(result: dict, label: dict) -> bool:
+    metadata = result.get("metadata") or {}
+    paths = [metadata.get("file_path", "")]
+    try:
+        paths.extend(source["file_path"] for source in json.loads(metadata.get("sources") or "[]"))
+    except (ValueError, KeyError, TypeError):
+        pass
+
+    suffix = "/" + label["file"]
+    if not any(path.replace("\\", "/").endswith(suffix) for path in paths):
+        return False
+    symbol = label.get("symbol")
+    return symbol is None or symbol in (result.get("code") or "")
+
+
+def score_query(results: list[dict], labels: list[dict]) -> tuple[float, float, Optional[int]]:
+    """(recall, reciprocal rank, 1-based rank of the first relevant result or None) for one query."""
+    found = set()
+    first_rank = None
+    for rank, result in enumerate(results, start=1):
+        for i, label in enumerate(labels):
+            if is_relevant(result, label):
+                found.add(i)
+                if first_rank is None:
+                    first_rank = rank
+    recall = len(found) / len(labels) if labels else 0.0
+    return recall, (1.0 / first_rank if first_rank else 0.0), first_rank
+
+
+def index_size(kb_path: Path) -> dict:
+    """Bytes on disk per KB component (chroma, snapshot, lexical index, ...), skipping the source repos."""
+    sizes = {}
+    for entry in sorted(kb_path.iterdir()):
+        if entry.name == "repos":
+            continue
+        if entry.is_dir():
+            sizes[entry.name] = sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+        else:
+            sizes[entry.name] = entry.stat().st_size
+    sizes["total"] = sum(sizes.values())
+    return sizes
+
+
+def evaluate_tech(
+    manager: KnowledgeBaseManager,
+    tech_stack: str,
+    queries: list[dict],
+    k: int,
+    mode: str,
+    repeats: int = 5
+) -> dict:
+    texts = [q["query"] for q in queries]
+    # Warm-up opens the collection, lexical index and embedder so timings measure steady-state queries
+    for text in texts:
+        manager.query_single_tech(tech_stack, text, n_results=k, mode=mode)
+
+    latencies = []
+    recalls, reciprocal_ranks, misses = [], [], []
+    for query, text in zip(queries, texts):
+        for _ in range(max(1, repeats)):
+            started = time.perf_counter()
+            results = manager.query_single_tech(tech_stack, text, n_results=k, mode=mode)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        recall, reciprocal_rank, first_rank = score_query(results, query["relevant"])
+        recalls.append(recall)
+        reciprocal_ranks.append(reciprocal_rank)
+        if first_rank is None:
+            misses.append(text)
+
+    return {
+        "recall_at_k": round(statistics.mean(recalls), 4),
+        "mrr": round(statistics.mean(reciprocal_ranks), 4),
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "misses": misses
+    }
+
+
+def run_benchmark(
+    techs: Optional[list[str]] = None,
+    k: int = 5,
+    modes: Optional[list[str]] = None,
+    repeats: int = 5,
+    embedding_config: Optional[dict] = None,
+    work_path: Optional[str] = None,
+    workers: int = 1
+) -> dict:
+    """Build fixture KBs under `work_path` (a temp dir by default, removed afterwards) and score them."""
+    techs = techs or BENCHMARK_TECHS
+    modes = modes or BENCHMARK_MODES
+    embedding_config = embedding_config or BENCHMARK_EMBEDDING
+
+    keep = work_path is not None
+    base_path = Path(work_path or tempfile.mkdtemp(prefix="kb-benchmark-"))
+    try:
+        fixtures = {tech: load_fixture(tech) for tech in techs}
+        registry = {"tech_stacks": {
+            tech: {"kb_path": str(base_path / "knowledge_bases" / tech), "embedding": embedding_config}
+            for tech in techs
+        }}
+        registry_path = base_path / "config" / "tech_stack_registry.json"
+        registry_path.parent.mkdir(parents=True, exist_ok=True)
+        registry_path.write_text(json.dumps(registry, indent=2), encoding="utf-8")
+
+        builder = TechStackKnowledgeBuilder(str(base_path))
+        manager = KnowledgeBaseManager(str(base_path))
+        # Every timed query must search; cached results would measure the cache instead
+        manager.query_cache = QueryResultCache(max_entries=0)
+
+        report_techs = {}
+        for tech in techs:
+            build = builder.build_tech_kb(
+                tech,
+                workers=workers,
+                full=True,
+                embedding_config=embedding_config,
+                repos=fixture_repos(tech, fixtures[tech])
+            )
+            queries = fixtures[tech]["queries"]
+            report_techs[tech] = {
+                "chunks": manager._get_collection(tech).count(),
+                "queries": len(queries),
+                "index_bytes": index_size(base_path / "knowledge_bases" / tech),
+                "build_seconds": build["elapsed_seconds"],
+                "modes": {mode: evaluate_tech(manager, tech, queries, k, mode, repeats) for mode in modes}
+            }
+    finally:
+        if not keep:
+            shutil.rmtree(base_path, ignore_errors=True)
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "config": {
+            "k": k,
+            "modes": modes,
+            "repeats": repeats,
+            "embedding": embedding_config,
+            "snapshot": KB_USE_SNAPSHOT
+        },
+        "techs": report_techs,
+        "summary": {
+            mode: {
+                metric: round(statistics.mean(t["modes"][mode][metric] for t in report_techs.values()), 4)
+                for metric in COMPARED_METRICS
+            }
+            for mode in modes
+        } if report_techs else {}
+    }
+
+
+def compare_reports(baseline: dict, current: dict) -> dict:
+    """Per tech and mode, `{metric: [baseline, current, delta]}` for metrics present in both reports."""
+    comparison = {}
+    for tech, current_tech in current.get("techs", {}).items():
+        baseline_tech = baseline.get("techs", {}).get(tech)
+        if not baseline_tech:
+            continue
+        tech_diff = {}
+        for mode, metrics in current_tech["modes"].items():
+            baseline_metrics = baseline_tech["modes"].get(mode)
+            if not baseline_metrics:
+                continue
+            tech_diff[mode] = {
+                metric: [baseline_metrics[metric], metrics[metric], round(metrics[metric] - baseline_metrics[metric], 4)]
+                for metric in COMPARED_METRICS if metric in baseline_metrics and metric in metrics
+            }
+        old_size = baseline_tech.get("index_bytes", {}).get("total")
+        new_size = current_tech.get("index_bytes", {}).get("total")
+        if old_size is not None and new_size is not None:
+            tech_diff["index_bytes"] = [old_size, new_size, new_size - old_size]
+        comparison[tech] = tech_diff
+    return comparison
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m agent.knowledge_base.retrieval_benchmark",
+        description="Build fixture KBs offline and report recall@k, MRR, query latency and index size"
+    )
+    parser.add_argument("--techs", nargs="+", default=BENCHMARK_TECHS, choices=BENCHMARK_TECHS)
+    parser.add_argument("--modes", nargs="+", default=BENCHMARK_MODES, choices=BENCHMARK_MODES)
+    parser.add_argument("-k", type=int, default=5, help="Results per query scored for recall@k and MRR")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per query")
+    parser.add_argument("--embedding-backend", default=BENCHMARK_EMBEDDING["backend"])
+    parser.add_argument("--work-dir", default=None, help="Keep the built KBs here instead of a temp dir")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    parser.add_argument("--baseline", default=None, help="Earlier report to compare against")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        args.techs,
+        k=args.k,
+        modes=args.modes,
+        repeats=args.repeats,
+        embedding_config={"backend": args.embedding_backend},
+        work_path=args.work_dir
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote {args.output}")
+    print(json.dumps(report["summary"], indent=2))
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        print(json.dumps(compare_reports(baseline, report), indent=2))
@@ -0,0 +1,317 @@
+"""
+Read-only, memory-mapped snapshots of a tech's knowledge base.
+
+A snapshot directory holds:
+
+    snapshot.json     counts, dimensions, distance space, collection metadata
+    vectors.f16       float16 [count, dim] embeddings (np.memmap)
+    norms.f32         float32 squared norms for l2 distances
+    texts.bin         UTF-8 chunk text, concatenated
+    offsets.u64       count + 1 byte offsets into texts.bin
+    columns.json      chunk ids and dictionary-encoded metadata columns
+
+SnapshotCollection answers the subset of the Chroma collection API that
+KnowledgeBaseManager uses with a brute-force scan over the mapped vectors, so
+worker processes share one page-cached copy and open it in milliseconds.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SNAPSHOT_DIRNAME = "snapshot"
+SNAPSHOT_VERSION = 1
+EXPORT_PAGE_SIZE = 1000
+SCAN_BLOCK_ROWS = 65536
+
+
+def export_snapshot(collection, out_dir: Path, page_size: int = EXPORT_PAGE_SIZE) -> dict:
+    """Write a snapshot of a Chroma collection into `out_dir`, replacing any previous one atomically."""
+    out_dir = Path(out_dir)
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    ids: list[str] = []
+    metadatas: list[dict] = []
+    offsets = [0]
+    dim = None
+    count = 0
+
+    with open(tmp_dir / "vectors.f16", "wb") as vectors_file, \
+            open(tmp_dir / "norms.f32", "wb") as norms_file, \
+            open(tmp_dir / "texts.bin", "wb") as texts_file:
+        offset = 0
+        while True:
+            page = collection.get(
+                limit=page_size,
+                offset=offset,
+                include=["documents", "metadatas", "embeddings"]
+            )
+            if not len(page["ids"]):
+                break
+            vectors = np.asarray(page["embeddings"], dtype=np.float32)
+            dim = vectors.shape[1]
+            vectors_file.write(vectors.astype(np.float16).tobytes())
+            norms_file.write(np.square(vectors).sum(axis=1).astype(np.float32).tobytes())
+            for doc_id, doc, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                encoded = (doc or "").encode("utf-8")
+                texts_file.write(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+                ids.append(doc_id)
+                metadatas.append(metadata or {})
+            count += len(page["ids"])
+            offset += len(page["ids"])
+
+    np.asarray(offsets, dtype=np.uint64).tofile(tmp_dir / "offsets.u64")
+    (tmp_dir / "columns.json").write_text(json.dumps({"ids": ids, "columns": _encode_columns(metadatas)}), encoding="utf-8")
+
+    collection_metadata = dict(collection.metadata or {})
+    info = {
+        "version": SNAPSHOT_VERSION,
+        "count": count,
+        "dim": dim or 0,
+        "space": collection_metadata.get("hnsw:space", "l2"),
+        "collection": collection.name,
+        "metadata": collection_metadata,
+        "created_at": time.time()
+    }
+    (tmp_dir / "snapshot.json").write_text(json.dumps(info, indent=2), encoding="utf-8")
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    tmp_dir.rename(out_dir)
+    return info
+
+
+def import_snapshot(snapshot_dir: Path, client, batch_size: int = EXPORT_PAGE_SIZE):
+    """Load a snapshot into a (new or emptied) Chroma collection, e.g. to restore a KB without re-ingesting."""
+    snapshot = SnapshotCollection.open(snapshot_dir)
+    name = snapshot.name
+    if name in [c.name if hasattr(c, "name") else c for c in client.list_collections()]:
+        client.delete_collection(name)
+    collection = client.create_collection(name=name, metadata=snapshot.metadata or None)
+
+    batch_size = min(batch_size, client.get_max_batch_size())
+    for start in range(0, snapshot.count(), batch_size):
+        rows = range(start, min(start + batch_size, snapshot.count()))
+        collection.add(
+            ids=[snapshot.ids[i] for i in rows],
+            embeddings=np.asarray(snapshot.vectors[start:rows.stop], dtype=np.float32),
+            documents=[snapshot.text(i) for i in rows],
+            metadatas=[snapshot.row_metadata(i) for i in rows]
+        )
+    return collection
+
+
+def is_snapshot(path: Path) -> bool:
+    return (Path(path) / "snapshot.json").exists()
+
+
+class SnapshotCollection:
+    def __init__(self, path: Path, info: dict):
+        self.path = Path(path)
+        self.name = info["collection"]
+        self.metadata = info.get("metadata") or {}
+        self.space = info.get("space", "l2")
+        self._count = info["count"]
+        self._dim = info["dim"]
+        self._columns: Optional[dict] = None
+        self._row_by_id: Optional[dict[str, int]] = None
+        self._lock = threading.Lock()
+
+        if self._count:
+            self.vectors = np.memmap(self.path / "vectors.f16", dtype=np.float16, mode="r", shape=(self._count, self._dim))
+            self.norms = np.memmap(self.path / "norms.f32", dtype=np.float32, mode="r", shape=(self._count,))
+        else:
+            self.vectors = np.zeros((0, self._dim), dtype=np.float16)
+            self.norms = np.zeros(0, dtype=np.float32)
+        self.offsets = np.fromfile(self.path / "offsets.u64", dtype=np.uint64)
+        texts_path = self.path / "texts.bin"
+        if os.path.getsize(texts_path):
+            with open(texts_path, "rb") as f:
+                self._texts = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._texts = b""
+
+    @classmethod
+    def open(cls, path: Path) -> "SnapshotCollection":
+        info = json.loads((Path(path) / "snapshot.json").read_text(encoding="utf-8"))
+        if info.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version in {path}")
+        return cls(path, info)
+
+    @property
+    def ids(self) -> list[str]:
+        return self._load_columns()["ids"]
+
+    def count(self) -> int:
+        return self._count
+
+    def text(self, row: int) -> str:
+        return self._texts[int(self.offsets[row]):int(self.offsets[row + 1])].decode("utf-8")
+
+    def row_metadata(self, row: int) -> dict:
+        metadata = {}
+        for name, column in self._load_columns()["columns"].items():
+            code = int(column["codes"][row])
+            if code >= 0:
+                metadata[name] = column["values"][code]
+        return metadata
+
+    def query(
+        self,
+        query_embeddings,
+        n_results: int = 10,
+        where: Optional[dict] = None,
+        include: Optional[list[str]] = None
+    ) -> dict:
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[np.newaxis, :]
+        mask = self._where_mask(where)
+
+        distances = np.empty((len(queries), self._count), dtype=np.float32)
+        for start in range(0, self._count, SCAN_BLOCK_ROWS):
+            block = np.asarray(self.vectors[start:start + SCAN_BLOCK_ROWS], dtype=np.float32)
+            dots = queries @ block.T
+            if self.space == "cosine":
+                block_norms = np.sqrt(self.norms[start:start + SCAN_BLOCK_ROWS])
+                query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+                distances[:, start:start + len(block)] = 1 - dots / np.clip(query_norms * block_norms, 1e-12, None)
+            elif self.space == "ip":
+                distances[:, start:start + len(block)] = 1 - dots
+            else:
+                query_norms = np.square(queries).sum(axis=1, keepdims=True)
+                distances[:, start:start + len(block)] = query_norms + self.norms[start:start + SCAN_BLOCK_ROWS] - 2 * dots
+        if mask is not None:
+            distances[:, ~mask] = np.inf
+
+        available = self._count if mask is None else int(mask.sum())
+        k = min(n_results, available)
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for row_distances in distances:
+            if k == 0:
+                top = np.empty(0, dtype=np.int64)
+            else:
+                top = np.argpartition(row_distances, k - 1)[:k]
+                top = top[np.argsort(row_distances[top])]
+            result["ids"].append([self.ids[i] for i in top])
+            result["documents"].append([self.text(i) for i in top])
+            result["metadatas"].append([self.row_metadata(i) for i in top])
+            result["distances"].append([float(max(0.0, row_distances[i])) for i in top])
+        return result
+
+    def get(
+        self,
+        ids: Optional[list[str]] = None,
+        where: Optional[dict] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Optional[list[str]] = None
+    ) -> dict:
+        include = include if include is not None else ["documents", "metadatas"]
+        if ids is not None:
+            row_by_id = self._load_row_index()
+            rows = [row_by_id[i] for i in ids if i in row_by_id]
+        else:
+            rows = list(range(self._count))
+        mask = self._where_mask(where)
+        if mask is not None:
+            rows = [r for r in rows if mask[r]]
+        rows = rows[(offset or 0):]
+        if limit is not None:
+            rows = rows[:limit]
+
+        result = {"ids": [self.ids[r] for r in rows]}
+        result["documents"] = [self.text(r) for r in rows] if "documents" in include else None
+        result["metadatas"] = [self.row_metadata(r) for r in rows] if "metadatas" in include else None
+        result["embeddings"] = np.asarray(self.vectors[rows], dtype=np.float32) if "embeddings" in include else None
+        return result
+
+    def _where_mask(self, where: Optional[dict]):
+        if not where:
+            return None
+        columns = self._load_columns()["columns"]
+        mask = np.ones(self._count, dtype=bool)
+        for name, value in where.items():
+            column = columns.get(name)
+            if column is None or value not in column["values"]:
+                return np.zeros(self._count, dtype=bool)
+            mask &= column["codes"] == column["values"].index(value)
+        return mask
+
+    def _load_columns(self) -> dict:
+        if self._columns is None:
+            with self._lock:
+                if self._columns is None:
+                    columns = json.loads((self.path / "columns.json").read_text(encoding="utf-8"))
+                    for column in columns["columns"].values():
+                        column["codes"] = np.asarray(column["codes"], dtype=np.int32)
+                    self._columns = columns
+        return self._columns
+
+    def _load_row_index(self) -> dict[str, int]:
+        if self._row_by_id is None:
+            self._row_by_id = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        return self._row_by_id
+
+
+def _encode_columns(metadatas: list[dict]) -> dict:
+    """Dictionary-encode each metadata key: distinct values once, one int code per row (-1 when absent)."""
+    names = sorted({key for metadata in metadatas for key in metadata})
+    columns = {}
+    for name in names:
+        values: list = []
+        index: dict = {}
+        codes = []
+        for metadata in metadatas:
+            if name not in metadata:
+                codes.append(-1)
+                continue
+            value = metadata[name]
+            if value not in index:
+                index[value] = len(values)
+                values.append(value)
+            codes.append(index[value])
+        columns[name] = {"values": values, "codes": codes}
+    return columns
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from agent.knowledge_base.kb_manager import _get_client, get_kb_manager
+
+    parser = argparse.ArgumentParser(
+        prog="python -m agent.knowledge_base.snapshot",
+        description="Export a tech's KB to a memory-mapped snapshot, or import a snapshot back into Chroma"
+    )
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("tech_stack")
+    args = parser.parse_args()
+
+    manager = get_kb_manager()
+    tech_info = manager.get_tech_info(args.tech_stack)
+    if not tech_info:
+        raise SystemExit(f"Unknown tech stack: {args.tech_stack}")
+    kb_path = Path(tech_info["kb_path"])
+    client = _get_client(kb_path / "chroma")
+
+    if args.action == "export":
+        collection = client.get_collection(f"{args.tech_stack}_patterns")
+        print(f"Exported snapshot: {export_snapshot(collection, kb_path / SNAPSHOT_DIRNAME)}")
+    else:
+        collection = import_snapshot(kb_path / SNAPSHOT_DIRNAME, client)
+        print(f"Imported {collection.count()} chunks into {collection.name}")
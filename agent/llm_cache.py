@@ -0,0 +1,125 @@
+"""
+Persistent cache for deterministic LLM results.
+
+Planner, architect and tech-detector calls run at temperature 0, so the same
+model + prompt + output schema always maps to the same structured result.
+Results are stored in SQLite under .appbuilder/cache, keyed by a content hash,
+and evicted least-recently-used once the cache grows past its size budget.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from agent.agent_registry import get_structured_llm
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".appbuilder/cache/llm_cache.sqlite3")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class LLMCache:
+    def __init__(self, path: str | Path = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_results_access ON llm_results(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, schema: Any) -> str:
+        payload = json.dumps({"model": model, "prompt": prompt, "schema": schema}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE llm_results SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_results (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM llm_results ORDER BY last_access").fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= target:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM llm_results WHERE key = ?", stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_results")
+            self._conn.commit()
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def is_cacheable(llm) -> bool:
+    return LLM_CACHE_ENABLED and (getattr(llm, "temperature", None) or 0) < 1e-6
+
+
+def invoke_structured(llm, schema: type[T], prompt: str, use_cache: bool = True) -> Optional[T]:
+    """Run `llm.with_structured_output(schema)` on `prompt`, reusing a cached result when allowed.
+
+    With `use_cache=False` the cache is not read, but the fresh result still replaces the stored one.
+    """
+    if not is_cacheable(llm):
+        return get_structured_llm(llm, schema).invoke(prompt)
+
+    cache = get_llm_cache()
+    key = cache.make_key(llm.model_name, prompt, schema.model_json_schema())
+
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return schema.model_validate_json(cached)
+
+    response = get_structured_llm(llm, schema).invoke(prompt)
+    if response is not None:
+        cache.put(key, response.model_dump_json())
+    return response
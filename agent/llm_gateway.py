@@ -0,0 +1,302 @@
+"""
+Shared LLM gateway for all agents.
+
+Every agent gets its chat model from get_llm(), so all LLM traffic in the
+process goes through one place that:
+- reuses pooled keep-alive HTTP connections
+- caps concurrent requests globally and per model
+- paces requests/min and tokens/min with token buckets
+- queues calls that hit a provider 429 instead of failing them
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Optional
+
+import groq
+import httpx
+from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_groq import ChatGroq
+from pydantic import PrivateAttr
+
+_ = load_dotenv()
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MODEL_MAX_CONCURRENCY = int(os.getenv("LLM_MODEL_MAX_CONCURRENCY", "8"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+LLM_MAX_QUEUE_SECONDS = float(os.getenv("LLM_MAX_QUEUE_SECONDS", "600"))
+LLM_POOL_CONNECTIONS = int(os.getenv("LLM_POOL_CONNECTIONS", "32"))
+LLM_TRANSIENT_RETRIES = 2
+
+_TRANSIENT_ERRORS = (groq.APIConnectionError, groq.InternalServerError)
+
+
+class TokenBucket:
+    """Reservation-based token bucket refilled continuously at `per_minute`."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(per_minute, 1.0)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens and return how long the caller must wait before using them."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            # The bucket keeps refilling during a pause, so the two waits overlap instead of adding up
+            return max(0.0, -self.tokens / self.rate, self.paused_until - self.updated)
+
+    def adjust(self, delta: float) -> None:
+        """Charge (positive) or refund (negative) tokens after the real cost is known."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every new reservation for at least `seconds`."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class ModelLimits:
+    def __init__(self):
+        self.semaphore = threading.BoundedSemaphore(LLM_MODEL_MAX_CONCURRENCY)
+        self.requests = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(LLM_TOKENS_PER_MINUTE)
+
+
+class LLMGateway:
+    def __init__(self):
+        self._semaphore = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+        self._limits: dict[str, ModelLimits] = {}
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._async_http_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+    @property
+    def http_client(self) -> httpx.Client:
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=_pool_limits(), timeout=_pool_timeout())
+            return self._http_client
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        """Pooled async client for the running event loop (async connections cannot move between loops)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            _drop_closed_loops(self._async_http_clients)
+            if loop not in self._async_http_clients:
+                self._async_http_clients[loop] = httpx.AsyncClient(limits=_pool_limits(), timeout=_pool_timeout())
+            return self._async_http_clients[loop]
+
+    def limits_for(self, model: str) -> ModelLimits:
+        with self._lock:
+            if model not in self._limits:
+                self._limits[model] = ModelLimits()
+            return self._limits[model]
+
+    def _reserve(self, model: str, estimated_tokens: int) -> float:
+        limits = self.limits_for(model)
+        return max(limits.requests.reserve(1), limits.tokens.reserve(estimated_tokens))
+
+    def _settle(self, model: str, estimated_tokens: int, result: ChatResult) -> None:
+        usage = (result.llm_output or {}).get("token_usage") or {}
+        actual = usage.get("total_tokens")
+        if actual:
+            self.limits_for(model).tokens.adjust(actual - estimated_tokens)
+
+    def _on_rate_limited(self, model: str, error: groq.RateLimitError, attempt: int) -> float:
+        retry_after = _retry_after_seconds(error) or min(2 ** attempt, 60)
+        limits = self.limits_for(model)
+        limits.requests.pause(retry_after)
+        limits.tokens.pause(retry_after)
+        return retry_after
+
+    @contextmanager
+    def _slot(self, model: str):
+        limits = self.limits_for(model)
+        with self._semaphore, limits.semaphore:
+            yield
+
+    @asynccontextmanager
+    async def _aslot(self, model: str):
+        # Same semaphores as _slot, so sync and async callers share one set of caps
+        limits = self.limits_for(model)
+        await _acquire(self._semaphore)
+        try:
+            await _acquire(limits.semaphore)
+            try:
+                yield
+            finally:
+                limits.semaphore.release()
+        finally:
+            self._semaphore.release()
+
+    def run(self, model: str, estimated_tokens: int, call: Callable[[], ChatResult]) -> ChatResult:
+        deadline = time.monotonic() + LLM_MAX_QUEUE_SECONDS
+        rate_limited = transient = 0
+        while True:
+            time.sleep(self._reserve(model, estimated_tokens))
+            try:
+                with self._slot(model):
+                    result = call()
+            except groq.RateLimitError as e:
+                rate_limited += 1
+                self._on_rate_limited(model, e, rate_limited)
+                if time.monotonic() >= deadline:
+                    raise
+                continue
+            except _TRANSIENT_ERRORS:
+                transient += 1
+                if transient > LLM_TRANSIENT_RETRIES:
+                    raise
+                time.sleep(2 ** transient)
+                continue
+            self._settle(model, estimated_tokens, result)
+            return result
+
+    async def arun(self, model: str, estimated_tokens: int, call: Callable[[], Any]) -> ChatResult:
+        deadline = time.monotonic() + LLM_MAX_QUEUE_SECONDS
+        rate_limited = transient = 0
+        while True:
+            await asyncio.sleep(self._reserve(model, estimated_tokens))
+            try:
+                async with self._aslot(model):
+                    result = await call()
+            except groq.RateLimitError as e:
+                rate_limited += 1
+                self._on_rate_limited(model, e, rate_limited)
+                if time.monotonic() >= deadline:
+                    raise
+                continue
+            except _TRANSIENT_ERRORS:
+                transient += 1
+                if transient > LLM_TRANSIENT_RETRIES:
+                    raise
+                await asyncio.sleep(2 ** transient)
+                continue
+            self._settle(model, estimated_tokens, result)
+            return result
+
+
+async def _acquire(semaphore: threading.BoundedSemaphore) -> None:
+    if semaphore.acquire(blocking=False):
+        return
+    waiter = asyncio.ensure_future(asyncio.to_thread(semaphore.acquire))
+    try:
+        await asyncio.shield(waiter)
+    except asyncio.CancelledError:
+        # The worker thread still takes the slot; hand it back once it has
+        waiter.add_done_callback(lambda _: semaphore.release())
+        raise
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_POOL_CONNECTIONS,
+        max_keepalive_connections=LLM_POOL_CONNECTIONS,
+        keepalive_expiry=120
+    )
+
+
+def _pool_timeout() -> httpx.Timeout:
+    return httpx.Timeout(120.0, connect=10.0)
+
+
+def _drop_closed_loops(by_loop: dict) -> None:
+    for loop in [loop for loop in by_loop if loop.is_closed()]:
+        del by_loop[loop]
+
+
+gateway = LLMGateway()
+
+
+class GatewayChatGroq(ChatGroq):
+    """ChatGroq whose requests are scheduled by the shared gateway."""
+
+    _loop_async_clients: dict = PrivateAttr(default_factory=dict)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs: Any
+    ) -> ChatResult:
+        return gateway.run(
+            self.model_name,
+            self._estimate_tokens(messages, kwargs),
+            lambda: ChatGroq._generate(self, messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs: Any
+    ) -> ChatResult:
+        llm = self.model_copy(update={"async_client": self._loop_async_client()})
+        return await gateway.arun(
+            self.model_name,
+            self._estimate_tokens(messages, kwargs),
+            lambda: ChatGroq._agenerate(llm, messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+    def _loop_async_client(self):
+        """Groq async completions bound to the gateway's pooled client for the running loop."""
+        loop = asyncio.get_running_loop()
+        _drop_closed_loops(self._loop_async_clients)
+        if loop not in self._loop_async_clients:
+            groq_client = self.async_client._client.copy(http_client=gateway.async_http_client())
+            self._loop_async_clients[loop] = groq_client.chat.completions
+        return self._loop_async_clients[loop]
+
+    def _estimate_tokens(self, messages: list[BaseMessage], kwargs: dict) -> int:
+        prompt_chars = sum(len(str(m.content)) for m in messages) + len(str(kwargs.get("tools", "")))
+        return prompt_chars // 4 + (self.max_tokens or 1024)
+
+
+_llms: dict[tuple, GatewayChatGroq] = {}
+_llms_lock = threading.Lock()
+
+
+def get_llm(model: str = DEFAULT_MODEL, temperature: Optional[float] = None) -> GatewayChatGroq:
+    """Return the process-wide chat model for `model`/`temperature`."""
+    key = (model, temperature)
+    with _llms_lock:
+        if key not in _llms:
+            params = {"model": model, "http_client": gateway.http_client, "max_retries": 0}
+            if temperature is not None:
+                params["temperature"] = temperature
+            _llms[key] = GatewayChatGroq(**params)
+        return _llms[key]
+
+
+def _retry_after_seconds(error: groq.RateLimitError) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
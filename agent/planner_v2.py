@@ -1,40 +1,66 @@
-from langchain_groq import ChatGroq
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
+from agent.llm_gateway import get_llm
+from agent.llm_cache import invoke_structured
+from agent.context_packer import pack_grouped, PLANNER_CONTEXT_TOKENS
 from agent.states import EnhancedPlan, File
 from agent.tech_detector import TechStackDetector
-from agent.knowledge_base.kb_manager import KnowledgeBaseManager
+from agent.knowledge_base.kb_manager import get_kb_manager
 
 
-planning_llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0)
+planning_llm = get_llm(temperature=0)
 
 
 def planner_agent_v2(state: dict) -> dict:
+    return _run_sync(aplanner_agent_v2(state))
+
+
+async def aplanner_agent_v2(state: dict) -> dict:
     user_prompt = state["user_prompt"]
     user_edits = state.get("user_edits")
+    use_cache = state.get("use_cache", True)
     
     detector = TechStackDetector()
-    tech_detection = detector.detect(user_prompt)
+    kb_manager = get_kb_manager()
     
-    kb_manager = KnowledgeBaseManager()
-    project_examples = {}
+    # Start KB lookups for techs the prompt names while the detector LLM call runs
+    detection_task = asyncio.create_task(detector.adetect(user_prompt, use_cache=use_cache))
+    lookups = {
+        tech: asyncio.create_task(kb_manager.aquery_single_tech(tech, user_prompt, n_results=3))
+        for tech in kb_manager.match_techs(user_prompt)
+    }
     
-    for tech in tech_detection.get("all_techs", []):
-        try:
-            examples = kb_manager.query_single_tech(
-                tech_stack=tech,
-                query=user_prompt,
-                n_results=3
-            )
-            if examples:
-                project_examples[tech] = examples
-        except Exception:
-            pass
+    project_examples = {}
+    try:
+        tech_detection = await detection_task
+        detected_techs = tech_detection.get("all_techs", [])
+        
+        for tech in lookups:
+            if tech not in detected_techs:
+                lookups[tech].cancel()
+        for tech in detected_techs:
+            if tech not in lookups:
+                lookups[tech] = asyncio.create_task(kb_manager.aquery_single_tech(tech, user_prompt, n_results=3))
+        
+        for tech in detected_techs:
+            try:
+                examples = await lookups[tech]
+                if examples:
+                    project_examples[tech] = examples
+            except Exception:
+                pass
+    finally:
+        # Also runs when detection fails: cancel leftover lookups and retrieve every outcome
+        for task in lookups.values():
+            task.cancel()
+        await asyncio.gather(*lookups.values(), return_exceptions=True)
 
     examples_text = _format_examples(project_examples)
     
     prompt = _build_planning_prompt(user_prompt, tech_detection, examples_text, user_edits)
     
-    response = planning_llm.with_structured_output(EnhancedPlan).invoke(prompt)
+    response = await asyncio.to_thread(invoke_structured, planning_llm, EnhancedPlan, prompt, use_cache)
     
     if response is None:
         raise ValueError("Planner did not return a valid response")
@@ -55,6 +81,15 @@ def planner_agent_v2(state: dict) -> dict:
     }
 
 
+def _run_sync(coro):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
 def _build_planning_prompt(
     user_prompt: str,
     tech_detection: dict,
@@ -97,12 +132,9 @@ def _format_examples(project_examples: dict) -> str:
         return ""
     
     parts = []
-    for tech, examples in project_examples.items():
-        if not examples:
-            continue
+    for tech, examples in pack_grouped(project_examples, PLANNER_CONTEXT_TOKENS, max_per_group=2).items():
         parts.append(f"\n### {tech.upper()} Examples:")
-        for i, ex in enumerate(examples[:2], 1):
-            code = ex.get("code", "")[:500]
-            parts.append(f"Example {i}:\n```\n{code}\n```")
+        for i, ex in enumerate(examples, 1):
+            parts.append(f"Example {i}:\n```\n{ex['code']}\n```")
     
     return "\n".join(parts)
@@ -1,6 +1,8 @@
 from typing import Optional
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+
+from agent.blob_store import get_text, put_text
 
 
 class File(BaseModel):
@@ -24,6 +26,9 @@ class ImplementationTask(BaseModel):
     filepath: str = Field(description="The path to the file to be modified")
     task_description: str = Field(
         description="A detailed description of the task to be performed on the file, e.g. 'add user authentication', 'implement data processing logic', etc.")
+    depends_on: list[str] = Field(
+        default_factory=list,
+        description="Paths of other files in the plan that this file imports or relies on")
 
 
 class TaskPlan(BaseModel):
@@ -71,8 +76,36 @@ class GlobalContext(BaseModel):
     project_files: list[str] = Field(default_factory=list, description="All project file paths")
 
 
+class GeneratedFile(BaseModel):
+    filepath: str = Field(description="The path of the file being implemented")
+    content: str = Field("", description="The complete content of the file")
+    needs_files: list[str] = Field(
+        default_factory=list,
+        description="Paths of project files you must read before writing this one; leave content empty when set")
+
+
 class FileDiff(BaseModel):
+    """A file change; contents live in the blob store and are read on access."""
     filepath: str
-    before_content: Optional[str] = None
-    after_content: str
-    status: str = Field("created", description="created, modified, deleted")
\ No newline at end of file
+    before_ref: Optional[str] = None
+    after_ref: str
+    status: str = Field("created", description="created, modified, deleted")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _store_contents(cls, data):
+        if isinstance(data, dict) and ("before_content" in data or "after_content" in data):
+            data = dict(data)
+            if "before_content" in data:
+                data["before_ref"] = put_text(data.pop("before_content"))
+            if "after_content" in data:
+                data["after_ref"] = put_text(data.pop("after_content") or "")
+        return data
+
+    @property
+    def before_content(self) -> Optional[str]:
+        return get_text(self.before_ref)
+
+    @property
+    def after_content(self) -> str:
+        return get_text(self.after_ref) or ""
\ No newline at end of file
@@ -1,22 +1,24 @@
+import asyncio
 import json
 from pathlib import Path
 from typing import Optional
 
-from langchain_groq import ChatGroq
+from agent.llm_gateway import get_llm
+from agent.llm_cache import get_llm_cache, is_cacheable
 
 
 class TechStackDetector:
     def __init__(self, registry_path: str = ".appbuilder/config/tech_stack_registry.json"):
         self.registry_path = Path(registry_path)
         self.registry = self._load_registry()
-        self.llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0)
+        self.llm = get_llm(temperature=0)
 
     def _load_registry(self) -> dict:
         if not self.registry_path.exists():
             return {"tech_stacks": {}}
         return json.loads(self.registry_path.read_text())
 
-    def detect(self, user_prompt: str) -> dict:
+    def detect(self, user_prompt: str, use_cache: bool = True) -> dict:
         available_techs = self._get_tech_summary()
         
         detection_prompt = f"""Analyze this project request and identify required technologies.
@@ -35,21 +37,35 @@ Respond ONLY with valid JSON (no markdown, no explanation):
     "reasoning": "1-2 sentence explanation of why these techs were chosen"
 }}"""
 
-        response = self.llm.invoke(detection_prompt)
-        
-        try:
-            content = response.content.strip()
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-            detection = json.loads(content)
-        except json.JSONDecodeError:
-            detection = self._fallback_detection(user_prompt)
+        cache_key = None
+        detection = None
+        if is_cacheable(self.llm):
+            cache_key = get_llm_cache().make_key(self.llm.model_name, detection_prompt, "tech_detection")
+            cached = get_llm_cache().get(cache_key) if use_cache else None
+            if cached is not None:
+                detection = json.loads(cached)
+
+        if detection is None:
+            response = self.llm.invoke(detection_prompt)
+            
+            try:
+                content = response.content.strip()
+                if content.startswith("```"):
+                    content = content.split("```")[1]
+                    if content.startswith("json"):
+                        content = content[4:]
+                detection = json.loads(content)
+                if cache_key:
+                    get_llm_cache().put(cache_key, json.dumps(detection))
+            except json.JSONDecodeError:
+                detection = self._fallback_detection(user_prompt)
 
         detection["all_techs"] = self._expand_tech_list(detection)
         return detection
 
+    async def adetect(self, user_prompt: str, use_cache: bool = True) -> dict:
+        return await asyncio.to_thread(self.detect, user_prompt, use_cache)
+
     def _get_tech_summary(self) -> dict:
         summary = {}
         for tech_id, info in self.registry.get("tech_stacks", {}).items():
@@ -6,12 +6,15 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 import difflib
 
+from agent.blob_store import blob_ref, get_blob_store
 from db.database import get_db
 from db.models import User, Project, ProjectFile
 from api.auth import get_current_user
 
 router = APIRouter(prefix="/projects", tags=["diffs"])
 
+_EMPTY_REF = blob_ref("")
+
 
 class FileDiffResponse(BaseModel):
     filepath: str
@@ -65,11 +68,17 @@ def get_project_diffs(
     diffs = []
     files_with_changes = 0
     
+    # Equal refs mean equal contents, so only changed files are read from the blob store
+    changed = [f for f in files if (f.before_ref or _EMPTY_REF) != (f.content_ref or _EMPTY_REF)]
+    contents = get_blob_store().get_many(
+        ref for f in changed for ref in (f.before_ref, f.content_ref) if ref is not None
+    )
+    changed_ids = {f.id for f in changed}
+    
     for f in files:
-        before = f.before_content or ""
-        after = f.content or ""
-        
-        if before != after:
+        if f.id in changed_ids:
+            before = contents.get(f.before_ref, "")
+            after = contents.get(f.content_ref, "")
             files_with_changes += 1
             unified, additions, deletions = generate_unified_diff(before, after, f.filepath)
             diffs.append(FileDiffResponse(
@@ -118,7 +127,7 @@ def get_file_diff(
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
     
-    before = file.previous_content or ""
+    before = file.before_content or ""
     after = file.content or ""
     unified, additions, deletions = generate_unified_diff(before, after, filepath)
     
@@ -81,6 +81,7 @@ def retry_project(
 def regenerate_project(
     project_id: str,
     background_tasks: BackgroundTasks,
+    use_cache: bool = True,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
@@ -97,7 +98,7 @@ def regenerate_project(
     project.status = ProjectStatus.PLANNING
     db.commit()
     
-    background_tasks.add_task(generate_project_v2, project_id, user.id, project.prompt)
+    background_tasks.add_task(generate_project_v2, project_id, user.id, project.prompt, use_cache)
     
     return {"status": "regenerating", "project_id": project_id}
 
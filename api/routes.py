@@ -8,13 +8,27 @@ from api.models import (ProgressInfo, generateRequest, projectResponse,
                         ProjectsListResponse)
 from agent.graph import graph
 from api.tasks import generate_project_task
-from agent.checkpoint import get_checkpoint_path, Checkpoint
+from agent.checkpoint import get_project_checkpoint_path, list_checkpoints, load_summary, load_file_paths
 from fastapi import HTTPException
 from api.store import PROJECT_TRACKING
 from fastapi.responses import StreamingResponse, Response
 
 router = APIRouter()
 
+
+def _checkpoint_path(project_id: str) -> Path:
+    """
+    Checkpoint of a project tracked by this worker, or else its id-keyed checkpoint
+    (PROJECT_TRACKING is per process; another worker may have run the generation).
+    """
+    if project_id in PROJECT_TRACKING:
+        return Path(PROJECT_TRACKING[project_id])
+    checkpoint_path = get_project_checkpoint_path(project_id)
+    if not checkpoint_path.exists():
+        raise HTTPException(status_code=404, detail="Project not found")
+    return checkpoint_path
+
+
 @router.post("/generate", response_model=projectResponse,status_code=status.HTTP_202_ACCEPTED)
 async def generate_project(playload: generateRequest, background_task: BackgroundTasks):
     """
@@ -34,21 +48,18 @@ async def get_project_status(project_id: str):
     """
     Retrieves the status of a project by its ID.
     """ 
-    if project_id not in PROJECT_TRACKING:
-        raise HTTPException(status_code=404, detail="Project not found")
-    checkpoint_path = Path(PROJECT_TRACKING[project_id])
+    checkpoint_path = _checkpoint_path(project_id)
 
     if not checkpoint_path.exists():
         raise HTTPException(status_code=500, detail="Checkpoint file missing")
 
-    checkpoint = Checkpoint.load(checkpoint_path)
+    summary = load_summary(checkpoint_path)
 
-    total_files = len(checkpoint.files)
-    completed_files = sum(1 for f in checkpoint.files if f.status == "completed")
-    failed_files = sum(1 for f in checkpoint.files if f.status == "failed")
-    running_files = sum(1 for f in checkpoint.files if f.status == "running")
+    total_files = summary["total_files"]
+    completed_files = summary["completed"]
+    failed_files = summary["failed"]
 
-    if checkpoint.is_complete():
+    if summary["is_complete"]:
         if failed_files > 0:
             overall_status = "failed"
         else:
@@ -56,8 +67,7 @@ async def get_project_status(project_id: str):
     else:
         overall_status = "generating"
     
-    next_pending = checkpoint.get_next_pending()
-    current_file = next_pending.file if next_pending else None
+    current_file = summary["current_file"]
 
     return statusResponse(
         project_id=project_id,
@@ -74,40 +84,33 @@ async def get_project_files(project_id: str):
     """
     Retrieves the list of files for a project by its ID.
     """ 
-    if project_id not in PROJECT_TRACKING:
-        raise HTTPException(status_code=404, detail="Project not found")
-    checkpoint_path = Path(PROJECT_TRACKING[project_id])
+    checkpoint_path = _checkpoint_path(project_id)
 
     if not checkpoint_path.exists():
         raise HTTPException(status_code=500, detail="Checkpoint file missing")
 
-    checkpoint = Checkpoint.load(checkpoint_path)
+    summary = load_summary(checkpoint_path)
 
     return fileListResponse(
         project_id=project_id,
-        files=[f.file for f in checkpoint.files],
-        total_files=len(checkpoint.files),
-        completed_files=sum(1 for f in checkpoint.files if f.status == "completed"),
-        failed_files=sum(1 for f in checkpoint.files if f.status == "failed"),
-        running_files=sum(1 for f in checkpoint.files if f.status == "running"),
+        files=load_file_paths(checkpoint_path),
+        total_files=summary["total_files"],
+        completed_files=summary["completed"],
+        failed_files=summary["failed"],
+        running_files=summary["running"],
     )
 @router.get("/projects/{project_id}/files/{filename}")
 async def get_file_content(project_id: str, filename: str):
     """
     Retrieves the content of a specific file for a project by its ID and filename.
     """
-    if project_id not in PROJECT_TRACKING:
-        raise HTTPException(status_code=404, detail="Project not found")
-    checkpoint_path = Path(PROJECT_TRACKING[project_id])
+    checkpoint_path = _checkpoint_path(project_id)
 
     if not checkpoint_path.exists():
         raise HTTPException(status_code=500, detail="Checkpoint file missing")
 
-    checkpoint = Checkpoint.load(checkpoint_path)
-
     # Find the file in the checkpoint
-    file = next((f for f in checkpoint.files if f.file == filename), None)
-    if not file:
+    if filename not in load_file_paths(checkpoint_path):
         raise HTTPException(status_code=404, detail="File not found")
 
     # Determine project directory and read file
@@ -137,26 +140,24 @@ async def download_project(project_id: str):
     """
     Downloads the project files for a project by its ID.
     """
-    if project_id not in PROJECT_TRACKING:
-        raise HTTPException(status_code=404, detail="Project not found")
-    checkpoint_path = Path(PROJECT_TRACKING[project_id])
+    checkpoint_path = _checkpoint_path(project_id)
 
     if not checkpoint_path.exists():
         raise HTTPException(status_code=500, detail="Checkpoint file missing")
 
-    checkpoint = Checkpoint.load(checkpoint_path)
+    summary = load_summary(checkpoint_path)
 
-    project_name = checkpoint.project_name
+    project_name = summary["project_name"]
 
     # Create ZIP file in memory (not on disk)
     project_dir = Path("generated_project")
     zip_buffer = io.BytesIO()
     
     with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for file in checkpoint.files:
-            file_path = project_dir / file.file
+        for filename in load_file_paths(checkpoint_path):
+            file_path = project_dir / filename
             if file_path.exists():
-                zipf.write(file_path, arcname=file.file)
+                zipf.write(file_path, arcname=filename)
     
     zip_buffer.seek(0)  # Reset buffer position
     
@@ -170,22 +171,25 @@ async def download_project(project_id: str):
 @router.get("/projects", response_model=ProjectsListResponse)
 async def list_all_projects():
     projects = []
-    for project_id, checkpoint_path in PROJECT_TRACKING.items():
-        checkpoint = Checkpoint.load(checkpoint_path)
+    # Id-keyed checkpoints on disk include projects generated by other workers
+    tracked = {project_id: str(path) for project_id, path in list_checkpoints().items()}
+    tracked.update(PROJECT_TRACKING)
+    for project_id, checkpoint_path in tracked.items():
+        summary = load_summary(checkpoint_path)
         
-        # Calculate status from files
-        total = len(checkpoint.files)
-        completed = sum(1 for f in checkpoint.files if f.status == "completed")
-        failed = sum(1 for f in checkpoint.files if f.status == "failed")
+        # Counts come from the checkpoint summary, not a full load
+        total = summary["total_files"]
+        completed = summary["completed"]
+        failed = summary["failed"]
         
-        if checkpoint.is_complete():
+        if summary["is_complete"]:
             overall_status = "failed" if failed > 0 else "completed"
         else:
             overall_status = "generating"
         
         projects.append(ProjectSummary(
             project_id=project_id,
-            name=checkpoint.project_name,
+            name=summary["project_name"],
             status=overall_status,
             total_files=total,
             completed_files=completed,
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 import zipfile
 import io
 
+from agent.blob_store import get_blob_store
 from db.database import get_db
 from db.models import User, Project, Plan, TaskPlanRecord, ProjectFile, ProjectStatus
 from api.auth import get_current_user, get_optional_user
@@ -21,6 +22,7 @@ router = APIRouter(prefix="/v2", tags=["projects-v2"])
 class GenerateRequest(BaseModel):
     prompt: str
     project_name: Optional[str] = None
+    use_cache: bool = True
 
 
 class GenerateResponse(BaseModel):
@@ -57,7 +59,7 @@ def generate_project(
     db.add(project)
     db.commit()
     
-    background_tasks.add_task(generate_project_v2, project_id, user.id, request.prompt)
+    background_tasks.add_task(generate_project_v2, project_id, user.id, request.prompt, request.use_cache)
     
     return GenerateResponse(
         project_id=project_id,
@@ -147,6 +149,7 @@ def get_project_tasks(
 def approve_plan(
     project_id: str,
     background_tasks: BackgroundTasks,
+    use_cache: bool = True,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
@@ -168,7 +171,7 @@ def approve_plan(
         plan.approved_at = datetime.utcnow()
         db.commit()
     
-    background_tasks.add_task(resume_after_plan_approval, project_id)
+    background_tasks.add_task(resume_after_plan_approval, project_id, use_cache)
     
     return {"status": "plan_approved", "message": "Proceeding to task generation"}
 
@@ -221,7 +224,7 @@ def get_project_files(
     
     return {
         "project_id": project_id,
-        "files": [{"path": f.filepath, "size": len(f.content) if f.content else 0} for f in files]
+        "files": [{"path": f.filepath, "size": f.content_size or 0} for f in files]
     }
 
 
@@ -279,10 +282,12 @@ def download_project(
     
     files = db.query(ProjectFile).filter(ProjectFile.project_id == project_id).all()
     
+    contents = get_blob_store().get_many(f.content_ref for f in files if f.content_ref)
+    
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
         for f in files:
-            zipf.writestr(f.filepath, f.content or "")
+            zipf.writestr(f.filepath, contents.get(f.content_ref, ""))
     
     zip_buffer.seek(0)
     
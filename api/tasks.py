@@ -1,6 +1,6 @@
 import logging 
 import time
-from agent.checkpoint import get_checkpoint_path
+from agent.checkpoint import get_checkpoint_path, get_project_checkpoint_path
 from agent.graph import agent
 from api.store import PROJECT_TRACKING
 
@@ -22,14 +22,17 @@ def generate_project_task(project_id: str, user_prompt: str):
         )
         
         # After generation, get the checkpoint path
-        # The checkpoint is named after the project name (from planner)
-        if "task_plan" in result and hasattr(result["task_plan"], "plan"):
-            project_name = result["task_plan"].plan.name
-            checkpoint_path = get_checkpoint_path(project_name)
-            
-            # Store the mapping
+        # Checkpoints are keyed by project id; older ones were named after the project name (from planner)
+        checkpoint_path = get_project_checkpoint_path(project_id)
+        if not checkpoint_path.exists() and "task_plan" in result and hasattr(result["task_plan"], "plan"):
+            checkpoint_path = get_checkpoint_path(result["task_plan"].plan.name)
+        
+        # Store the mapping, but only for a checkpoint that was actually written
+        if checkpoint_path.exists():
             PROJECT_TRACKING[project_id] = str(checkpoint_path)
             logger.info(f"Stored checkpoint path for {project_id}: {checkpoint_path}")
+        else:
+            logger.warning(f"No checkpoint found for {project_id}")
         
         logger.info(f"Project {project_id} generated successfully")
         
@@ -1,18 +1,23 @@
 import logging
+import os
 from typing import Optional
 from datetime import datetime
 
 from sqlalchemy.orm import Session
 
-from agent.graph_v2 import build_graph_v2, build_architect_graph, build_coder_graph
+from agent.blob_store import get_blob_store
+from agent.graph_v2 import get_compiled_graph
+from agent.states import FileDiff
 from db.database import get_db_session
 from db.models import Project, Plan, TaskPlanRecord, ProjectFile, ProjectStatus
 
 logger = logging.getLogger("uvicorn")
 
+PARALLEL_CODER = os.getenv("CODER_PARALLEL", "false").lower() in ("1", "true", "yes")
 
-def generate_project_v2(project_id: str, user_id: str, user_prompt: str):
-    graph = build_graph_v2()
+
+def generate_project_v2(project_id: str, user_id: str, user_prompt: str, use_cache: bool = True):
+    graph = get_compiled_graph("planner", parallel_coder=PARALLEL_CODER)
     
     config = {
         "configurable": {"thread_id": project_id},
@@ -26,7 +31,7 @@ def generate_project_v2(project_id: str, user_id: str, user_prompt: str):
             db.commit()
     
     try:
-        result = graph.invoke({"user_prompt": user_prompt}, config)
+        result = graph.invoke({"user_prompt": user_prompt, "use_cache": use_cache}, config)
         
         _save_plan_to_db(project_id, result, user_prompt)
         
@@ -70,9 +75,9 @@ def _save_plan_to_db(project_id: str, result: dict, user_prompt: str):
         db.commit()
 
 
-def resume_after_plan_approval(project_id: str):
+def resume_after_plan_approval(project_id: str, use_cache: bool = True):
     import json
-    graph = build_architect_graph()  # Use architect entry point
+    graph = get_compiled_graph("architect", parallel_coder=PARALLEL_CODER)  # Use architect entry point
     
     config = {
         "configurable": {"thread_id": project_id},
@@ -99,7 +104,8 @@ def resume_after_plan_approval(project_id: str):
         result = graph.invoke({
             "plan": plan_dict,  # Pass as dict, not Pydantic model
             "stage": "plan_approved",
-            "plan_user_action": "approved"
+            "plan_user_action": "approved",
+            "use_cache": use_cache
         }, config)
         
         _save_task_plan_to_db(project_id, result)
@@ -139,7 +145,7 @@ def _save_task_plan_to_db(project_id: str, result: dict):
 
 def resume_after_task_approval(project_id: str):
     import json
-    graph = build_coder_graph()  # Use coder entry point
+    graph = get_compiled_graph("coder", parallel_coder=PARALLEL_CODER)  # Use coder entry point
     
     config = {
         "configurable": {"thread_id": project_id},
@@ -202,23 +208,27 @@ def _save_generated_files(project_id: str, result: dict):
         logger.info(f"Found {len(file_diffs)} file_diffs")
         
         for diff in file_diffs:
-            filepath = diff.filepath if hasattr(diff, 'filepath') else diff.get('filepath')
-            content = diff.after_content if hasattr(diff, 'after_content') else diff.get('after_content', '')
+            if isinstance(diff, dict):
+                diff = FileDiff.model_validate(diff)
+            # The diff's content is already in the blob store; the row just takes its ref
+            size = get_blob_store().size(diff.after_ref)
             
-            logger.info(f"Saving file: {filepath}, content length: {len(content) if content else 0}")
+            logger.info(f"Saving file: {diff.filepath}, content length: {size or 0}")
             
             existing = db.query(ProjectFile).filter(
                 ProjectFile.project_id == project_id,
-                ProjectFile.filepath == filepath
+                ProjectFile.filepath == diff.filepath
             ).first()
             
             if existing:
-                existing.content = content
+                existing.content_ref = diff.after_ref
+                existing.content_size = size
             else:
                 db.add(ProjectFile(
                     project_id=project_id,
-                    filepath=filepath,
-                    content=content
+                    filepath=diff.filepath,
+                    content_ref=diff.after_ref,
+                    content_size=size
                 ))
         
         db.commit()
@@ -1,8 +1,9 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import and_, create_engine, inspect, or_, text
+from sqlalchemy.orm import sessionmaker, Session, undefer
 from contextlib import contextmanager
 
-from db.models import Base
+from agent.blob_store import get_blob_store, put_text
+from db.models import Base, ProjectFile
 
 DATABASE_URL = "sqlite:///./appbuilder.db"
 
@@ -12,6 +13,80 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    migrate_file_contents()
+
+
+def _add_missing_columns():
+    # create_all never alters existing tables; new nullable columns are added in place
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                    ))
+
+
+def migrate_file_contents(batch_size: int = 200) -> int:
+    """
+    Copy inline ProjectFile contents into the blob store; returns the number of rows migrated.
+    The inline columns are kept, so a rollback or a worker without the store still reads them.
+    """
+    migrated = 0
+    while True:
+        with get_db_session() as db:
+            rows = db.query(ProjectFile).options(
+                undefer(ProjectFile.legacy_content),
+                undefer(ProjectFile.legacy_before_content)
+            ).filter(or_(
+                and_(ProjectFile.legacy_content.isnot(None), ProjectFile.content_ref.is_(None)),
+                and_(ProjectFile.legacy_before_content.isnot(None), ProjectFile.before_ref.is_(None))
+            )).limit(batch_size).all()
+            if not rows:
+                return migrated
+            
+            for row in rows:
+                if row.legacy_content is not None and row.content_ref is None:
+                    row.content_ref = put_text(row.legacy_content)
+                    row.content_size = len(row.legacy_content.encode("utf-8"))
+                if row.legacy_before_content is not None and row.before_ref is None:
+                    row.before_ref = put_text(row.legacy_before_content)
+            migrated += len(rows)
+
+
+def clear_legacy_contents(batch_size: int = 200) -> int:
+    """
+    Empty the inline content columns of rows whose blobs are in the store; returns the rows cleared.
+    Not run at startup: only once every deployment reads from the same blob store.
+    """
+    store = get_blob_store()
+    cleared = 0
+    last_id = ""
+    while True:
+        with get_db_session() as db:
+            rows = db.query(ProjectFile).options(
+                undefer(ProjectFile.legacy_content),
+                undefer(ProjectFile.legacy_before_content)
+            ).filter(
+                ProjectFile.id > last_id,
+                or_(ProjectFile.legacy_content.isnot(None), ProjectFile.legacy_before_content.isnot(None))
+            ).order_by(ProjectFile.id).limit(batch_size).all()
+            if not rows:
+                return cleared
+            
+            for row in rows:
+                if row.legacy_content is not None and row.content_ref is not None and row.content_ref in store:
+                    row.legacy_content = None
+                if row.legacy_before_content is not None and row.before_ref is not None and row.before_ref in store:
+                    row.legacy_before_content = None
+                if row.legacy_content is None and row.legacy_before_content is None:
+                    cleared += 1
+            last_id = rows[-1].id
 
 
 def get_db():
@@ -33,3 +108,14 @@ def get_db_session() -> Session:
         raise
     finally:
         db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m db.database")
+    parser.add_argument("action", choices=["clear-legacy-contents"])
+    args = parser.parse_args()
+
+    init_db()
+    print(f"Cleared inline contents of {clear_legacy_contents()} project files")
@@ -5,7 +5,9 @@ from enum import Enum
 
 from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer, ForeignKey, JSON
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, deferred
+
+from agent.blob_store import get_text, put_text
 
 Base = declarative_base()
 
@@ -84,14 +86,43 @@ class ProjectFile(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     project_id = Column(String, ForeignKey("projects.id"), nullable=False, index=True)
     filepath = Column(String, nullable=False)
-    content = Column(Text, nullable=True)
+    # Contents live in the blob store; rows only hold refs and the size
+    content_ref = Column(String, nullable=True)
+    content_size = Column(Integer, nullable=True)
+    before_ref = Column(String, nullable=True)
     status = Column(String, default="pending")
-    before_content = Column(Text, nullable=True)
     error_log = Column(Text, nullable=True)
     attempts = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Inline text columns from before the blob store. migrate_file_contents() copies them into the
+    # store and leaves them in place; only `python -m db.database clear-legacy-contents` empties them
+    legacy_content = deferred(Column("content", Text, nullable=True))
+    legacy_before_content = deferred(Column("before_content", Text, nullable=True))
+    
     project = relationship("Project", back_populates="files")
+    
+    @property
+    def content(self) -> Optional[str]:
+        # A blob missing from this store (e.g. another deployment's store) falls back to the inline copy
+        content = get_text(self.content_ref)
+        return self.legacy_content if content is None else content
+    
+    @content.setter
+    def content(self, value: Optional[str]) -> None:
+        self.content_ref = put_text(value)
+        self.content_size = len(value.encode("utf-8")) if value is not None else None
+        self.legacy_content = None
+    
+    @property
+    def before_content(self) -> Optional[str]:
+        before_content = get_text(self.before_ref)
+        return self.legacy_before_content if before_content is None else before_content
+    
+    @before_content.setter
+    def before_content(self, value: Optional[str]) -> None:
+        self.before_ref = put_text(value)
+        self.legacy_before_content = None
 
 
 class ChatMessage(Base):